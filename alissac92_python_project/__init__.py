@@ -0,0 +1,20 @@
+"""
+Return-pattern prediction for daily stock data.
+
+Importing the package has no side effects: nothing is read, printed or
+plotted, and matplotlib is only imported by the plotting layer (plots.py)
+when a figure is drawn. Command-line entry point:
+
+    python -m alissac92_python_project [--log-level LEVEL] {report,pipeline,sweep,benchmark,update} [options]
+"""
+
+from .labels import UP, DOWN, tru_lbl, vote
+from .pattern_index import PatternIndex
+from .walk_forward import walk_forward, walk_forward_probs
+from .evaluate import confusion_table
+from .backtest import backtest
+from .csv_cache import read_csv_cached
+from .schema import PRICE_SCHEMA, FRAUD_SCHEMA, read_schema
+from .pipeline import run_pipeline
+from .sweep import sweep_frame
+from .rolling import rolling_moments, indicators, indicator_frame, RollingWindows
@@ -0,0 +1,33 @@
+"""
+Command-line entry point: python -m alissac92_python_project <command> [options]
+"""
+
+import argparse
+import importlib
+import logging
+import sys
+
+# command name -> module whose main(argv) runs it (imported only when chosen)
+COMMANDS = {
+    'report': 'alissac92_python_project',
+    'pipeline': 'pipeline',
+    'sweep': 'sweep',
+    'benchmark': 'benchmark',
+    'update': 'incremental',
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m alissac92_python_project')
+    parser.add_argument('--log-level', default='WARNING', type=str.upper,
+                        help='logging level for diagnostics and profiles (default: %(default)s)')
+    parser.add_argument('command', choices=sorted(COMMANDS))
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='options for the command (see <command> -h)')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format='%(levelname)s %(name)s: %(message)s')
+    module = importlib.import_module('.' + COMMANDS[args.command], __package__)
+    return module.main(args.args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Vectorized backtest engine.
+
+Takes one returns vector and a 2-D matrix of 0/1 (or '+'/'-') signal
+columns and computes every strategy's equity curve in a single
+cumulative-product pass, plus summary stats per strategy.
+"""
+
+import numpy as np
+import pandas as pd
+from .labels import lbl_bits
+
+
+# 'signal_mask' turns a matrix of 0/1 (or '+'/'-') labels into a boolean in-market mask
+def signal_mask(signals):
+    return lbl_bits(signals).astype(bool)
+
+
+# 'max_drawdown' returns the largest peak-to-trough loss of each equity curve (column)
+def max_drawdown(curves):
+    curves = np.asarray(curves, dtype=float)
+    peaks = np.maximum.accumulate(curves, axis=0)
+    return (1 - curves / peaks).max(axis=0)
+
+
+# 'backtest' invests 'invest' dollars per strategy, holding the stock on days its signal is UP
+# the first row only sets the starting value, matching a position opened at the first close
+def backtest(returns, signals, names=None, invest=100, hold=True):
+    returns = np.asarray(returns, dtype=float)
+    if names is None:
+        names = list(signals.columns) if isinstance(signals, pd.DataFrame) else None
+    mask = signal_mask(signals)
+    if mask.ndim == 1:
+        mask = mask[:, None]
+    if mask.shape[0] != len(returns):
+        raise ValueError('signals must have one row per return')
+    if names is None:
+        names = ['S{}'.format(i) for i in range(mask.shape[1])]
+    if hold: # buy & hold is the strategy that is always in the market
+        mask = np.column_stack([mask, np.ones(len(returns), dtype=bool)])
+        names = list(names) + ['Buy & Hold']
+    mask[:1] = False
+
+    growth = 1 + mask * returns[:, None]
+    curves = invest * np.cumprod(growth, axis=0)
+
+    stats = pd.DataFrame({
+        'Final Value': curves[-1] if len(curves) else np.full(len(names), float(invest)),
+        'Max Drawdown': max_drawdown(curves) if len(curves) else np.zeros(len(names)),
+        'Exposure': mask[1:].mean(axis=0) if len(curves) > 1 else np.zeros(len(names)),
+    }, index=names)
+    return pd.DataFrame(curves, columns=names), stats
@@ -0,0 +1,165 @@
+"""
+Benchmark suite for the stock and fraud pipelines.
+
+Generates seeded synthetic data (see synthetic.py), times each stage
+'repeat' times and writes the results as JSON. Passing --compare with an
+earlier results file flags any stage whose best time regressed by more
+than --tolerance and exits non-zero, so it can gate a CI job.
+
+    python -m alissac92_python_project benchmark --days 5000 --tickers 4 --rows 200000 --out bench.json
+    python -m alissac92_python_project benchmark --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .backtest import backtest
+from .evaluate import confusion_table
+from .labels import tru_lbl
+from .pattern_index import PatternIndex
+from .rolling import indicators
+from .synthetic import make_prices, make_transactions
+from .walk_forward import walk_forward_probs
+
+MODEL_FEATURES = ['V4', 'V11', 'V2', 'V19', 'V27'] # the features the fraud models use
+
+
+# 'timed' runs fn 'repeat' times and returns the wall-clock seconds of each run
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+# 'result' summarizes one stage's timings as a JSON-ready dict
+def result(group, stage, rows, times):
+    best = min(times)
+    return {'group': group, 'stage': stage, 'rows': rows, 'repeat': len(times),
+            'min_s': best, 'median_s': statistics.median(times), 'mean_s': statistics.mean(times),
+            'rows_per_s': rows / best if best > 0 else None}
+
+
+# 'bench_stock' times labeling, pattern counting, walk-forward prediction, backtesting and
+# evaluation over 'n_tickers' synthetic series of 'n_days' each (testing on the second half)
+def bench_stock(n_days, n_tickers, repeat, seed=0, max_k=4, windows=(2, 3, 4)):
+    frames = [make_prices(n_days, seed=seed + t) for t in range(n_tickers)]
+    rows = n_days * n_tickers
+    start = n_days // 2
+    for df in frames:
+        tru_lbl(df)
+    labels = [df['True Return'].to_numpy() for df in frames]
+    preds = [(walk_forward_probs(lbl, windows, start) > 0.50).astype(np.int8) for lbl in labels]
+    returns = [df['Return'].to_numpy()[start:] for df in frames]
+    truth = [lbl[start:] for lbl in labels]
+    prices = np.vstack([df['Adj Close'].to_numpy() for df in frames]) # ticker x time
+    daily = np.vstack([df['Return'].to_numpy() for df in frames])
+
+    stages = {
+        'labeling': lambda: [tru_lbl(df) for df in frames],
+        'pattern_counting': lambda: [PatternIndex(lbl, max_k=max_k) for lbl in labels],
+        'walk_forward': lambda: [walk_forward_probs(lbl, windows, start) for lbl in labels],
+        'backtest': lambda: [backtest(r, p) for r, p in zip(returns, preds)],
+        'evaluation': lambda: [confusion_table(t, p) for t, p in zip(truth, preds)],
+        'rolling_indicators': lambda: indicators(prices, daily, (5, 14, 50, 200)),
+    }
+    return [result('stock', name, rows, timed(fn, repeat)) for name, fn in stages.items()]
+
+
+# 'bench_fraud' times fit and predict for each classifier from the fraud script
+def bench_fraud(n_rows, repeat, seed=0):
+    from sklearn.model_selection import train_test_split
+    from sklearn.naive_bayes import GaussianNB
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.linear_model import LogisticRegression
+
+    df = make_transactions(n_rows, seed=seed)
+    X = StandardScaler().fit_transform(df[MODEL_FEATURES])
+    y = df['Class'].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, stratify=y, random_state=92)
+
+    models = {
+        'logistic_regression': LogisticRegression,
+        'knn_k3': lambda: KNeighborsClassifier(n_neighbors=3),
+        'gaussian_nb': GaussianNB,
+        'decision_tree': lambda: DecisionTreeClassifier(random_state=92),
+    }
+    results = []
+    for name, make in models.items():
+        model = make().fit(X_train, y_train)
+        results.append(result('fraud', name + '.fit', len(X_train),
+                              timed(lambda: make().fit(X_train, y_train), repeat)))
+        results.append(result('fraud', name + '.predict', len(X_test),
+                              timed(lambda: model.predict(X_test), repeat)))
+
+    # the k = 1..9 selection sweep, answered from one neighbor query
+    from alissac92_python_project2.acrist_term_project import knn_sweep
+    results.append(result('fraud', 'knn_sweep_k1_9', len(X_test),
+                          timed(lambda: knn_sweep(X_train, X_test, y_train, y_test), repeat)))
+    return results
+
+
+# 'compare' returns the stages whose best time is more than 'tolerance' slower than the baseline
+def compare(results, baseline, tolerance):
+    base = {(r['group'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = base.get((r['group'], r['stage']))
+        if old is not None and old['rows'] == r['rows'] and r['min_s'] > old['min_s'] * (1 + tolerance):
+            regressions.append((r['group'], r['stage'], old['min_s'], r['min_s']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the stock and fraud pipelines on synthetic data.')
+    parser.add_argument('--days', type=int, default=5000, help='trading days per synthetic ticker')
+    parser.add_argument('--tickers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=100000, help='synthetic transactions')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip', choices=['stock', 'fraud'], action='append', default=[])
+    parser.add_argument('--out', default='benchmark.json', help='where to write the JSON results')
+    parser.add_argument('--compare', help='earlier results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.20)
+    args = parser.parse_args(argv)
+
+    results = []
+    if 'stock' not in args.skip:
+        results += bench_stock(args.days, args.tickers, args.repeat, args.seed)
+    if 'fraud' not in args.skip:
+        results += bench_fraud(args.rows, args.repeat, args.seed)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'numpy': np.__version__,
+                 'pandas': pd.__version__, 'machine': platform.machine(),
+                 'params': {k: v for k, v in vars(args).items() if k not in ('out', 'compare')}},
+        'results': results,
+    }
+    print(pd.DataFrame(results).to_string(index=False))
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for group, stage, old, new in regressions:
+            print('REGRESSION {}/{}: {:.4f}s -> {:.4f}s'.format(group, stage, old, new))
+        status = 1 if regressions else 0
+    if args.out and args.out != args.compare:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+On-disk cache of parsed CSV frames.
+
+Each cached frame is a directory holding one .npy file per column plus a
+meta.json manifest. Numeric, boolean and datetime columns are stored raw
+and memory-mapped on load; string columns are stored as categorical
+codes plus their (small) category array. Entries are keyed on the source
+path and read_csv arguments, and validated against the source's size,
+mtime and content hash, so an edited CSV is re-parsed automatically.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+# 'file_hash' returns a blake2b digest of the file contents, read in 1 MiB blocks
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# 'cache_entry' returns the cache directory for a source path + read_csv arguments
+def cache_entry(path, cache_dir, read_kwargs):
+    key = json.dumps([os.path.abspath(path), sorted(read_kwargs.items())], default=repr)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, '{}-{}'.format(name, hashlib.sha1(key.encode()).hexdigest()[:16]))
+
+
+# 'save_frame' writes a frame column by column into 'entry' alongside its manifest; the entry is
+# built under a private temp name and swapped in by rename, and when several processes write the
+# same entry at once the first rename wins and the others discard their (identical) copies
+def save_frame(df, entry, meta):
+    tmp = entry + '.tmp{}'.format(os.getpid())
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        index_names = None
+        if not isinstance(df.index, pd.RangeIndex):
+            index_names = list(df.index.names)
+            df = df.reset_index()
+        columns = []
+        for i, col in enumerate(df.columns):
+            series = df[col]
+            dtype = series.dtype
+            if isinstance(dtype, pd.CategoricalDtype) or dtype.kind in 'OSUT' or str(dtype) in ('str', 'string'):
+                cat = series.astype('category')
+                np.save(os.path.join(tmp, '{}.codes.npy'.format(i)), cat.cat.codes.to_numpy())
+                np.save(os.path.join(tmp, '{}.cats.npy'.format(i)),
+                        np.asarray(cat.cat.categories.to_numpy(), dtype=object), allow_pickle=True)
+                kind = 'category'
+            elif dtype.kind in 'biufcmM' and getattr(dtype, 'tz', None) is None:
+                np.save(os.path.join(tmp, '{}.npy'.format(i)), series.to_numpy())
+                kind = 'array'
+            else:
+                raise TypeError('cannot cache column {!r} of dtype {}'.format(col, dtype))
+            columns.append({'name': col, 'kind': kind, 'dtype': str(dtype)})
+        meta = dict(meta, version=CACHE_VERSION, columns=columns, index=index_names, rows=len(df))
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+    except BaseException: # don't leave a half-written temp entry behind
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    old = entry + '.old{}'.format(os.getpid())
+    try:
+        os.rename(entry, old) # move a stale entry aside (a directory can't be replaced in one step)
+    except OSError:
+        old = None # no entry, or another writer moved it first
+    try:
+        os.rename(tmp, entry)
+    except OSError: # lost the race: another writer's entry is already in place
+        shutil.rmtree(tmp, ignore_errors=True)
+    if old:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# 'load_frame' rebuilds a cached frame, memory-mapping the raw columns copy-on-write
+# so callers can still modify the frame without touching the cache
+def load_frame(entry, meta):
+    data = {}
+    for i, col in enumerate(meta['columns']):
+        if col['kind'] == 'array':
+            data[col['name']] = np.load(os.path.join(entry, '{}.npy'.format(i)), mmap_mode='c').view(np.ndarray)
+        else:
+            codes = np.load(os.path.join(entry, '{}.codes.npy'.format(i)), mmap_mode='r')
+            cats = np.load(os.path.join(entry, '{}.cats.npy'.format(i)), allow_pickle=True)
+            values = pd.Categorical.from_codes(codes, cats)
+            data[col['name']] = values if col['dtype'] == 'category' else np.asarray(values, dtype=object)
+    df = pd.DataFrame(data, copy=False)
+    for col in meta['columns']:
+        if col['kind'] == 'category' and col['dtype'] not in ('category', 'object'):
+            df[col['name']] = df[col['name']].astype(col['dtype'])
+    if meta['index'] is not None:
+        df = df.set_index(meta['index'])
+        df.index.names = [None if n == 'index' else n for n in meta['index']]
+    return df
+
+
+# 'read_meta' returns an entry's manifest, or None if there is no usable entry
+def read_meta(entry):
+    try:
+        with open(os.path.join(entry, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+# 'read_csv_cached' is pd.read_csv with a binary cache in front of it
+# a matching size + mtime skips hashing on warm runs; when they differ the content hash
+# decides whether the old entry is still good (e.g. the same file copied in again)
+# 'verify=True' always checks the content hash; if the cache can't be written the parsed frame
+# is still returned, just uncached
+def read_csv_cached(path, cache_dir=None, verify=False, **read_kwargs):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.csv_cache')
+    entry = cache_entry(path, cache_dir, read_kwargs)
+    st = os.stat(path)
+    meta = read_meta(entry)
+    digest = None
+
+    if meta is not None:
+        same_stat = meta['size'] == st.st_size and meta['mtime_ns'] == st.st_mtime_ns
+        if same_stat and not verify:
+            return load_frame(entry, meta)
+        if meta['size'] == st.st_size:
+            digest = file_hash(path)
+        if digest is not None and meta['hash'] == digest:
+            if not same_stat: # content unchanged, just refresh the recorded mtime
+                meta['mtime_ns'] = st.st_mtime_ns
+                try:
+                    with open(os.path.join(entry, 'meta.json'), 'w') as f:
+                        json.dump(meta, f)
+                except OSError as exc: # read-only cache: the entry is still good, just re-hashed next time
+                    log.debug('could not refresh %s: %s', entry, exc)
+            return load_frame(entry, meta)
+
+    df = pd.read_csv(path, **read_kwargs)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_frame(df, entry, {'source': os.path.abspath(path), 'size': st.st_size,
+                               'mtime_ns': st.st_mtime_ns, 'hash': digest or file_hash(path)})
+    except (OSError, TypeError) as exc: # unwritable cache dir or uncacheable column: serve it uncached
+        log.warning('not caching %s: %s', path, exc)
+    return df
@@ -0,0 +1,70 @@
+"""
+Batched confusion-metric evaluator.
+
+Scores any number of prediction columns (or model outputs) against one
+set of truth labels in a single vectorized pass and returns a tidy table
+of TP/FP/TN/FN counts and the rates derived from them.
+"""
+
+import numpy as np
+import pandas as pd
+from .labels import UP, DOWN
+
+
+# 'safe_div' divides elementwise, returning 0.0 wherever the denominator is 0
+def safe_div(num, den):
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+# 'pred_matrix' stacks prediction columns into an (n, m) array and returns it with their names
+def pred_matrix(preds, names=None):
+    if isinstance(preds, pd.DataFrame):
+        values, default = preds.to_numpy(), preds.columns
+    elif isinstance(preds, dict):
+        values, default = np.column_stack([np.asarray(v) for v in preds.values()]), preds.keys()
+    else:
+        values = np.asarray(preds)
+        if values.ndim == 1:
+            values = values[:, None]
+        default = ['P{}'.format(i) for i in range(values.shape[1])]
+    return values, list(default if names is None else names)
+
+
+# 'confusion_table' tallies every prediction column against 'truth' at once
+# rows whose prediction is neither 'pos' nor 'neg' (e.g. NaN) count towards no cell,
+# but still count in the accuracy denominator
+def confusion_table(truth, preds, pos=UP, neg=DOWN, names=None):
+    truth = np.asarray(truth)
+    preds, names = pred_matrix(preds, names)
+    if preds.shape[0] != len(truth):
+        raise ValueError('predictions must have one row per truth label')
+
+    t_pos = (truth == pos)[:, None]
+    t_neg = (truth == neg)[:, None]
+    p_pos = preds == pos
+    p_neg = preds == neg
+    tp = np.count_nonzero(t_pos & p_pos, axis=0)
+    fp = np.count_nonzero(t_neg & p_pos, axis=0)
+    tn = np.count_nonzero(t_neg & p_neg, axis=0)
+    fn = np.count_nonzero(t_pos & p_neg, axis=0)
+    return rates_table(tp, fp, tn, fn, len(truth), names)
+
+
+# 'rates_table' builds the metrics table from per-column TP / FP / TN / FN counts over 'total' rows
+def rates_table(tp, fp, tn, fn, total, names):
+    tp, fp, tn, fn = (np.asarray(c, dtype=np.int64) for c in (tp, fp, tn, fn))
+    return pd.DataFrame({
+        'TP': tp,
+        'FP': fp,
+        'TN': tn,
+        'FN': fn,
+        'Accuracy': safe_div(tp + tn, total),
+        'Precision': safe_div(tp, tp + fp),
+        'NPV': safe_div(tn, tn + fn),
+        'TPR': safe_div(tp, tp + fn),
+        'TNR': safe_div(tn, tn + fp),
+    }, index=names)
@@ -0,0 +1,279 @@
+"""
+Append-only incremental updates for the multi-ticker pipeline.
+
+Each ticker keeps a small JSON state file: the training-period and
+walk-forward pattern counts (whose tails are the label history the next
+prediction needs), running TP/FP/TN/FN counts and, per strategy, the last
+equity value (as its growth factor), its running peak, max drawdown and
+days in the market, plus the byte offset of the CSV already consumed
+and a fingerprint of the file's head and the bytes just before it. An update checks the
+fingerprint (a rewritten file is never merged: its ticker is rebuilt from
+the start instead), reads only the complete rows appended since, folds each
+one in with O(windows) work, and re-derives the same patterns / strategies
+tables as pipeline.run_frame. A ticker that still fails is reported with its
+error, as in run_pipeline, and the other tickers update as usual.
+
+    python -m alissac92_python_project update STATE_DIR source... [--windows 2 3 4]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .evaluate import rates_table
+from .pattern_index import PatternIndex
+from .pipeline import describe_error, gather, pattern_stats, ticker_paths, write_report
+from .schema import PRICE_SCHEMA, PATTERN_COLUMNS, read_args
+
+log = logging.getLogger(__name__)
+
+STATE_VERSION = 2
+FINGERPRINT_BYTES = 4096 # bytes at the start and just before the offset that the fingerprint covers
+
+
+class TickerState:
+    # per-ticker running state for windows W, the ensemble and buy & hold
+    def __init__(self, windows=(2, 3, 4), test_year=2019, min_votes=2, threshold=0.50, invest=100):
+        self.windows = [int(w) for w in windows]
+        self.test_year = int(test_year)
+        self.min_votes = int(min_votes)
+        self.threshold = float(threshold)
+        self.invest = float(invest)
+        self.offset = 0 # bytes of the CSV consumed so far
+        self.fingerprint = None # hash of the consumed bytes just before 'offset'
+        self.last_date = None
+        self.rows = 0
+        self.train = PatternIndex([], max_k=4) # frozen once the test period starts
+        self.walk = PatternIndex([], max_k=max(self.windows) + 1)
+        n = len(self.windows) + 1 # every window plus the ensemble
+        self.test_rows = 0
+        self.confusion = np.zeros((n, 4), dtype=np.int64) # TP, FP, TN, FN
+        self.growth = np.ones(n + 1) # ... plus buy & hold; equity is invest * growth, as backtest
+        self.peak = np.full(n + 1, self.invest)
+        self.drawdown = np.zeros(n + 1)
+        self.exposure = np.zeros(n + 1, dtype=np.int64)
+
+    # 'names' returns the strategy names in table order
+    def names(self):
+        return ['W{}'.format(w) for w in self.windows] + ['Ensemble', 'Buy & Hold']
+
+    # 'params' returns the settings a saved state must match to be reused
+    def params(self):
+        return {'windows': self.windows, 'test_year': self.test_year, 'min_votes': self.min_votes,
+                'threshold': self.threshold, 'invest': self.invest}
+
+    # 'update' folds new rows (Date, Year, Return; oldest first, all after last_date) into the state
+    def update(self, df):
+        if len(df) == 0:
+            return 0
+        dates = pd.to_datetime(df['Date']).to_numpy()
+        if (np.diff(dates) <= np.timedelta64(0)).any() or (
+                self.last_date is not None and dates[0] <= np.datetime64(self.last_date)):
+            raise ValueError('new rows must be in date order and after {}'.format(self.last_date))
+
+        years = df['Year'].to_numpy()
+        returns = df['Return'].to_numpy(dtype=float)
+        for year, ret in zip(years.tolist(), returns.tolist()):
+            bit = 1 if ret >= 0 else 0
+            if year >= self.test_year:
+                # predict today from strictly earlier days, then score and trade on it
+                preds = [self.walk.next_prob(w) > self.threshold for w in self.windows]
+                preds.append(sum(preds) >= self.min_votes)
+                for i, p in enumerate(preds):
+                    self.confusion[i, (0 if bit else 1) if p else (3 if bit else 2)] += 1
+                if self.test_rows > 0: # the first test day only sets the starting value
+                    in_market = np.array(preds + [True])
+                    self.growth = self.growth * (1 + in_market * ret)
+                    self.exposure += in_market
+                equity = self.invest * self.growth
+                self.peak = np.maximum(self.peak, equity)
+                self.drawdown = np.maximum(self.drawdown, 1 - equity / self.peak)
+                self.test_rows += 1
+            else:
+                self.train.append(bit)
+            self.walk.append(bit)
+        self.rows += len(df)
+        self.last_date = str(pd.Timestamp(dates[-1]).date())
+        return len(df)
+
+    # 'patterns' returns the training-period pattern probabilities (as pipeline.pattern_stats)
+    def patterns(self):
+        return pattern_stats(self.train)
+
+    # 'strategies' returns the backtest stats joined with the prediction metrics (as run_frame)
+    def strategies(self):
+        names = self.names()
+        stats = pd.DataFrame({
+            'Final Value': self.invest * self.growth,
+            'Max Drawdown': self.drawdown,
+            'Exposure': self.exposure / (self.test_rows - 1) if self.test_rows > 1 else np.zeros(len(names)),
+        }, index=names)
+        tp, fp, tn, fn = self.confusion.T
+        scores = rates_table(tp, fp, tn, fn, self.test_rows, names[:-1])
+        strategies = stats.join(scores) # 'Buy & Hold' has no prediction metrics
+        strategies.index.name = 'Strategy'
+        return strategies
+
+    # 'to_state' / 'from_state' convert to and from JSON-ready data
+    def to_state(self):
+        return dict(self.params(), version=STATE_VERSION, offset=self.offset,
+                    fingerprint=self.fingerprint, last_date=self.last_date,
+                    rows=self.rows, train=self.train.to_state(), walk=self.walk.to_state(),
+                    test_rows=self.test_rows, confusion=self.confusion.tolist(), growth=self.growth.tolist(),
+                    peak=self.peak.tolist(), drawdown=self.drawdown.tolist(), exposure=self.exposure.tolist())
+
+    @classmethod
+    def from_state(cls, state):
+        self = cls(state['windows'], state['test_year'], state['min_votes'], state['threshold'], state['invest'])
+        self.offset, self.last_date, self.rows = state['offset'], state['last_date'], state['rows']
+        self.fingerprint = state['fingerprint']
+        self.train = PatternIndex.from_state(state['train'])
+        self.walk = PatternIndex.from_state(state['walk'])
+        self.test_rows = state['test_rows']
+        self.confusion = np.asarray(state['confusion'], dtype=np.int64)
+        self.growth = np.asarray(state['growth'], dtype=float)
+        self.peak = np.asarray(state['peak'], dtype=float)
+        self.drawdown = np.asarray(state['drawdown'], dtype=float)
+        self.exposure = np.asarray(state['exposure'], dtype=np.int64)
+        return self
+
+
+# 'fingerprint' hashes the first FINGERPRINT_BYTES of an open file and the FINGERPRINT_BYTES
+# before byte 'end', so a rewrite that changes the head or the last rows consumed is caught
+# without rereading the whole file
+def fingerprint(f, end):
+    digest = hashlib.blake2b(digest_size=16)
+    f.seek(0)
+    digest.update(f.read(min(end, FINGERPRINT_BYTES)))
+    f.seek(max(FINGERPRINT_BYTES, end - FINGERPRINT_BYTES))
+    digest.update(f.read(max(0, end - f.tell())))
+    return digest.hexdigest()
+
+
+# 'read_appended' parses the complete rows written to a CSV after byte 'offset' (0 = from the
+# header on); a last line still being written (no newline yet) is left for the next run. Returns
+# the rows with the new end offset and its fingerprint. A file that no longer matches
+# 'expected' (the fingerprint saved with 'offset') was rewritten, not appended, and is refused
+def read_appended(path, offset, expected=None):
+    with open(path, 'rb') as f:
+        header = f.readline()
+        if offset == 0:
+            offset = f.tell()
+        elif offset > os.fstat(f.fileno()).st_size or fingerprint(f, offset) != expected:
+            raise ValueError('{} no longer matches its saved state; it was rewritten, not appended'.format(path))
+        f.seek(offset)
+        data = f.read()
+        data = data[:data.rfind(b'\n') + 1] # only whole lines
+        end = offset + len(data)
+        tail = fingerprint(f, end)
+    df = pd.read_csv(io.BytesIO(header + data), **read_args(PRICE_SCHEMA, PATTERN_COLUMNS))
+    return df, end, tail
+
+
+# 'load_state' returns the saved state at 'path', or None if missing, outdated or for other settings
+def load_state(path, params):
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != STATE_VERSION or any(state.get(k) != v for k, v in params.items()):
+        return None
+    return TickerState.from_state(state)
+
+
+# 'save_state' writes a state atomically (temp file + rename)
+def save_state(path, state):
+    tmp = path + '.tmp{}'.format(os.getpid())
+    with open(tmp, 'w') as f:
+        json.dump(state.to_state(), f)
+    os.replace(tmp, path)
+
+
+# 'refresh' folds the rows appended to 'path' into 'state', moving its offset and fingerprint
+# only once they were accepted; returns the number of rows added
+def refresh(state, path):
+    new, offset, digest = read_appended(path, state.offset, state.fingerprint)
+    added = state.update(new)
+    state.offset, state.fingerprint = offset, digest
+    return added
+
+
+# 'update_ticker' brings one ticker's state up to date with its CSV, rebuilding it from the start
+# of the file if the saved state no longer fits; returns (ticker, rows added, patterns,
+# strategies, None), or (ticker, 0, None, None, error) if the ticker failed
+def update_ticker(path, state_dir, windows=(2, 3, 4), test_year=2019, min_votes=2):
+    ticker = os.path.splitext(os.path.basename(path))[0]
+    state_path = os.path.join(state_dir, ticker + '.json')
+    try:
+        fresh = TickerState(windows, test_year, min_votes)
+        state = load_state(state_path, fresh.params()) or fresh
+        try:
+            added = refresh(state, path)
+        except ValueError as exc: # rewritten file or out-of-order rows: the saved state is stale
+            if state is fresh:
+                raise
+            log.warning('%s: %s; rebuilding its state from the start of the file', ticker, exc)
+            state = fresh
+            added = refresh(state, path)
+        if added or state is fresh:
+            save_state(state_path, state)
+        return ticker, added, state.patterns(), state.strategies(), None
+    except Exception as exc: # one bad ticker must not sink the whole update
+        return ticker, 0, None, None, describe_error(exc)
+
+
+# 'run_update' updates every ticker across a process pool and gathers the same report as
+# run_pipeline (patterns, strategies, failed tickers), plus how many new rows each ticker had
+def run_update(source, state_dir, windows=(2, 3, 4), test_year=2019, min_votes=2, max_workers=None):
+    paths = ticker_paths(source)
+    if not paths:
+        raise ValueError('no ticker CSVs found in {!r}'.format(source))
+    os.makedirs(state_dir, exist_ok=True)
+    worker = partial(update_ticker, state_dir=state_dir, windows=tuple(windows), test_year=test_year,
+                     min_votes=min_votes)
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    profiling.count('tickers', len(paths))
+    with profiling.stage('tickers'), ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(worker, paths, chunksize=chunksize))
+
+    with profiling.stage('gather'):
+        added = pd.Series({t: n for t, n, _, _, _ in results}, name='New Rows')
+        patterns, strategies, failed = gather([(t, p, s, err) for t, _, p, s, err in results])
+    profiling.count('rows', int(added.sum()))
+    profiling.count('failed_tickers', len(failed))
+    return added, patterns, strategies, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fold newly appended rows into saved per-ticker state.')
+    parser.add_argument('state_dir', help='directory holding one <ticker>.json state per ticker')
+    parser.add_argument('source', nargs='+', help='ticker CSVs or directories of them (append-only)')
+    parser.add_argument('--windows', type=int, nargs='+', default=[2, 3, 4])
+    parser.add_argument('--test-year', type=int, default=2019)
+    parser.add_argument('--min-votes', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', help='directory to write patterns.csv, strategies.csv (and failures.csv)')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profiling.session(args.profile, args.profile_memory):
+        added, patterns, strategies, failed = run_update(args.source, args.state_dir, args.windows,
+                                                         args.test_year, args.min_votes, args.workers)
+        print('{:,} new rows across {} tickers'.format(int(added.sum()), len(added)))
+        with profiling.stage('write'):
+            write_report(patterns, strategies, failed, args.out)
+
+
+if __name__ == '__main__':
+    main()
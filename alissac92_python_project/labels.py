@@ -0,0 +1,58 @@
+"""
+Return labels and label voting shared by the stock script and pipeline.
+
+Labels are kept as int8 (UP = 1 for a '+' day, DOWN = 0 for a '-' day)
+and patterns of k consecutive labels as k-bit integer codes, oldest day
+in the highest bit. The '+'/'-' strings are only rendered for display.
+"""
+
+import numpy as np
+
+UP = 1
+DOWN = 0
+
+
+# define function 'tru_lbl' that creates int8 col 'True Return' (1 = pos return, 0 = neg)
+def tru_lbl(df):
+    df['True Return'] = (df['Return'] >= 0).to_numpy().astype(np.int8)
+    return df
+
+
+# 'lbl_bits' converts labels ('+'/'-' strings, 0/1 ints, bools, or floats with NaN) to int8 0/1
+def lbl_bits(labels):
+    labels = np.asarray(labels)
+    if labels.dtype.kind in 'biuf':
+        return (np.nan_to_num(labels.astype(float)) > 0).astype(np.int8)
+    return (labels == '+').astype(np.int8)
+
+
+# 'lbl_str' renders int8 labels as '+'/'-' for display (missing values become '')
+def lbl_str(labels):
+    labels = np.asarray(labels, dtype=float)
+    return np.where(np.isnan(labels), '', np.where(labels > 0, '+', '-')).astype(object)
+
+
+# 'show_lbls' returns a copy of df with the given label columns rendered as '+'/'-'
+def show_lbls(df, cols):
+    out = df.copy()
+    for col in cols:
+        out[col] = lbl_str(out[col])
+    return out
+
+
+# 'rolling_codes' returns the k-bit code of every length-k window of a 0/1 label array
+def rolling_codes(bits, k):
+    bits = np.asarray(bits, dtype=np.int64)
+    n = len(bits) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.zeros(n, dtype=np.int64)
+    for j in range(k):
+        codes = (codes << 1) | bits[j:j + n]
+    return codes
+
+
+# 'vote' labels a row UP when at least 'min_votes' of its prediction columns are UP
+def vote(preds, min_votes=2):
+    pos_count = lbl_bits(preds).sum(axis=1)
+    return (pos_count >= min_votes).astype(np.int8)
@@ -0,0 +1,120 @@
+"""
+Pattern-count index for up/down return labels.
+
+Counts every up/down pattern of length 1..K in one pass over a label
+series so that pattern probabilities become constant-time lookups
+instead of a string scan of the whole series per query. The index can
+also be grown one label at a time for walk-forward use.
+"""
+
+import numpy as np
+from .labels import lbl_bits, rolling_codes
+
+
+# 'pattern_code' turns a pattern string like '--+' into its integer code (bits read left to right)
+def pattern_code(pattern):
+    code = 0
+    for ch in pattern:
+        if ch == '+':
+            code = (code << 1) | 1
+        elif ch == '-':
+            code = code << 1
+        else:
+            raise ValueError("pattern may only contain '+' and '-': {!r}".format(pattern))
+    return code
+
+
+class PatternIndex:
+    # build counts for every pattern of length 1..max_k from a label series (int8 or '+'/'-')
+    def __init__(self, labels, max_k=4):
+        if max_k < 1:
+            raise ValueError('max_k must be at least 1')
+        self.max_k = max_k
+        bits = lbl_bits(labels)
+        self.n = len(bits)
+        self.counts = self._count(bits, max_k)
+        self.tail = 0 # code of the last (up to) max_k labels seen
+        for b in bits[-max_k:]:
+            self.tail = (self.tail << 1) | int(b)
+
+    # 'from_frame' builds the index from the 'True Return' column of a dataframe
+    @classmethod
+    def from_frame(cls, df, max_k=4):
+        return cls(df['True Return'].to_numpy(), max_k)
+
+    # single pass over the series: count the length-K windows, then fold them
+    # down to every shorter length (plus the one trailing window each fold misses)
+    @staticmethod
+    def _count(bits, max_k):
+        n = len(bits)
+        counts = [None] * (max_k + 1)
+        top = min(max_k, n)
+        codes = rolling_codes(bits, top)
+        for k in range(max_k, top, -1):
+            counts[k] = np.zeros(1 << k, dtype=np.int64) # series shorter than k
+        if n == 0:
+            counts[top] = np.zeros(1 << top, dtype=np.int64)
+        else:
+            counts[top] = np.bincount(codes, minlength=1 << top).astype(np.int64)
+        for k in range(top - 1, 0, -1):
+            folded = counts[k + 1].reshape(1 << k, 2).sum(axis=1)
+            tail = 0
+            for b in bits[n - k:]:
+                tail = (tail << 1) | int(b)
+            folded[tail] += 1
+            counts[k] = folded
+        return counts
+
+    # 'append' adds one 0/1 label and counts the new windows ending on it in O(K)
+    def append(self, bit):
+        self.tail = ((self.tail << 1) | int(bit)) & ((1 << self.max_k) - 1)
+        self.n += 1
+        for k in range(1, min(self.n, self.max_k) + 1):
+            self.counts[k][self.tail & ((1 << k) - 1)] += 1
+
+    # 'to_state' returns the index as plain JSON-ready data (counts, length and tail)
+    def to_state(self):
+        return {'max_k': self.max_k, 'n': self.n, 'tail': self.tail,
+                'counts': [c.tolist() for c in self.counts[1:]]}
+
+    # 'from_state' rebuilds an index saved with to_state, without the label series
+    @classmethod
+    def from_state(cls, state):
+        idx = cls.__new__(cls)
+        idx.max_k = state['max_k']
+        idx.n = state['n']
+        idx.tail = state['tail']
+        idx.counts = [None] + [np.asarray(c, dtype=np.int64) for c in state['counts']]
+        return idx
+
+    # 'count' returns how many (overlapping) times a pattern appears in the series
+    def count(self, pattern):
+        k = len(pattern)
+        if k == 0 or k > self.max_k:
+            raise ValueError('pattern length must be between 1 and {}'.format(self.max_k))
+        return int(self.counts[k][pattern_code(pattern)])
+
+    # 'ratio' returns count(n1) / (count(n1) + count(n2)), or 0.0 if neither appears
+    def ratio(self, n1, n2):
+        count_n1 = self.count(n1)
+        count_n2 = self.count(n2)
+        if (count_n1 + count_n2) == 0:
+            return 0.0
+        return count_n1 / (count_n1 + count_n2)
+
+    # 'prob_up' returns the probability of a '+' day following the given history
+    def prob_up(self, history):
+        return self.ratio(history + '+', history + '-')
+
+    # 'next_prob' returns the probability of a '+' day following the last w labels seen
+    def next_prob(self, w):
+        if w + 1 > self.max_k:
+            raise ValueError('w must be less than max_k ({})'.format(self.max_k))
+        if self.n < w:
+            return 0.0
+        hist = (self.tail & ((1 << w) - 1)) << 1
+        count_up = self.counts[w + 1][hist | 1]
+        count_dn = self.counts[w + 1][hist]
+        if (count_up + count_dn) == 0:
+            return 0.0
+        return count_up / (count_up + count_dn)
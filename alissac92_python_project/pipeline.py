@@ -0,0 +1,170 @@
+"""
+Multi-ticker pipeline.
+
+Runs labeling, pattern statistics, walk-forward prediction, ensembling,
+evaluation and backtesting for every ticker CSV in the SPY.csv schema
+across a process pool, then gathers the per-ticker results into one
+report: a table of pattern probabilities per ticker and a table of
+prediction/backtest metrics per (ticker, strategy). A ticker that fails
+(too short a history, a malformed file, ...) is logged and listed with
+its error next to those tables instead of ending the run.
+"""
+
+import argparse
+import glob
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .schema import PRICE_SCHEMA, PATTERN_COLUMNS, read_schema
+from .labels import tru_lbl, vote
+from .pattern_index import PatternIndex
+from .walk_forward import walk_forward_probs
+from .evaluate import confusion_table
+from .backtest import backtest
+
+log = logging.getLogger(__name__)
+
+
+# 'ticker_paths' expands a directory (every *.csv in it), a single CSV or a list of CSVs
+def ticker_paths(source):
+    if isinstance(source, (str, os.PathLike)):
+        source = [source]
+    paths = []
+    for src in source:
+        if os.path.isdir(src):
+            paths.extend(sorted(glob.glob(os.path.join(src, '*.csv'))))
+        else:
+            paths.append(os.fspath(src))
+    return paths
+
+
+# 'pattern_stats' returns P('+' after k '-' days) and P('-' after k '+' days) for k = 1..max_k
+def pattern_stats(idx, max_k=3):
+    stats = {}
+    for k in range(1, max_k + 1):
+        stats["P(+|{})".format('-' * k)] = idx.ratio('-' * k + '+', '-' * (k + 1))
+        stats["P(-|{})".format('+' * k)] = idx.ratio('+' * k + '-', '+' * (k + 1))
+    return stats
+
+
+# 'test_start' returns the row of the first trading day in 'test_year' or later
+def test_start(df, test_year):
+    in_test = (df['Year'] >= test_year).to_numpy()
+    if not in_test.any():
+        raise ValueError('no rows on or after {}'.format(test_year))
+    return int(np.argmax(in_test))
+
+
+# 'run_frame' runs every stage on one ticker's dataframe, training on years before 'test_year'
+def run_frame(df, windows=(2, 3, 4), test_year=2019, min_votes=2):
+    df = tru_lbl(df)
+    start = test_start(df, test_year)
+    labels = df['True Return'].to_numpy()
+
+    patterns = pattern_stats(PatternIndex(labels[:start], max_k=4))
+
+    test = df.iloc[start:].reset_index(drop=True)
+    w_cols = ['W{}'.format(w) for w in windows]
+    probs = walk_forward_probs(labels, windows, start=start)
+    preds = pd.DataFrame((probs > 0.50).astype(np.int8), columns=w_cols)
+    preds['Ensemble'] = vote(preds[w_cols], min_votes)
+
+    scores = confusion_table(test['True Return'], preds)
+    _, stats = backtest(test['Return'], preds)
+    strategies = stats.join(scores) # 'Buy & Hold' has no prediction metrics
+    strategies.index.name = 'Strategy'
+    return patterns, strategies
+
+
+# 'describe_error' turns a ticker's exception into the one-line reason reported for it
+def describe_error(exc):
+    return '{}: {}'.format(type(exc).__name__, exc)
+
+
+# 'run_ticker' reads one ticker CSV and runs it through the pipeline; returns
+# (ticker, patterns, strategies, None), or (ticker, None, None, error) if the ticker failed
+def run_ticker(path, **kwargs):
+    ticker = os.path.splitext(os.path.basename(path))[0]
+    try:
+        patterns, strategies = run_frame(read_schema(path, PRICE_SCHEMA, PATTERN_COLUMNS), **kwargs)
+    except Exception as exc: # one bad ticker must not sink the whole universe
+        return ticker, None, None, describe_error(exc)
+    return ticker, patterns, strategies, None
+
+
+# 'gather' joins per-ticker (ticker, patterns, strategies, error) results into the patterns and
+# strategies tables plus a Series of failed tickers and their errors, logging each failure
+def gather(results):
+    ok = [(t, p, s) for t, p, s, err in results if err is None]
+    failed = pd.Series({t: err for t, _, _, err in results if err is not None}, name='Error', dtype=object)
+    failed.index.name = 'Ticker'
+    for ticker, err in failed.items():
+        log.warning('%s failed: %s', ticker, err)
+    patterns = pd.DataFrame.from_dict({t: p for t, p, _ in ok}, orient='index')
+    patterns.index.name = 'Ticker'
+    strategies = (pd.concat({t: s for t, _, s in ok}, names=['Ticker', 'Strategy']) if ok
+                  else pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=['Ticker', 'Strategy'])))
+    return patterns, strategies, failed
+
+
+# 'write_report' writes patterns.csv, strategies.csv and (if any ticker failed) failures.csv
+# to 'out', or prints them when 'out' is None
+def write_report(patterns, strategies, failed, out=None):
+    if out:
+        os.makedirs(out, exist_ok=True)
+        patterns.to_csv(os.path.join(out, 'patterns.csv'))
+        strategies.to_csv(os.path.join(out, 'strategies.csv'))
+        if len(failed):
+            failed.to_csv(os.path.join(out, 'failures.csv'))
+    else:
+        print(patterns.to_string())
+        print(strategies.to_string())
+        if len(failed):
+            print('\nFailed tickers ({}):\n'.format(len(failed)) + failed.to_string())
+
+
+# 'run_pipeline' fans the tickers out over a process pool and gathers one report;
+# returns (patterns, strategies, failed tickers -> error)
+def run_pipeline(source, windows=(2, 3, 4), test_year=2019, min_votes=2, max_workers=None):
+    paths = ticker_paths(source)
+    if not paths:
+        raise ValueError('no ticker CSVs found in {!r}'.format(source))
+    worker = partial(run_ticker, windows=tuple(windows), test_year=test_year, min_votes=min_votes)
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4)) # batch small tickers to cut IPC overhead
+    profiling.count('tickers', len(paths))
+    with profiling.stage('tickers'), ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(worker, paths, chunksize=chunksize))
+
+    with profiling.stage('gather'):
+        patterns, strategies, failed = gather(results)
+    profiling.count('failed_tickers', len(failed))
+    return patterns, strategies, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the return-pattern pipeline over many tickers.')
+    parser.add_argument('source', nargs='+', help='ticker CSVs or directories of them')
+    parser.add_argument('--windows', type=int, nargs='+', default=[2, 3, 4])
+    parser.add_argument('--test-year', type=int, default=2019)
+    parser.add_argument('--min-votes', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', help='directory to write patterns.csv, strategies.csv (and failures.csv)')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profiling.session(args.profile, args.profile_memory):
+        patterns, strategies, failed = run_pipeline(args.source, args.windows, args.test_year,
+                                                    args.min_votes, args.workers)
+        with profiling.stage('write'):
+            write_report(patterns, strategies, failed, args.out)
+
+
+if __name__ == '__main__':
+    main()
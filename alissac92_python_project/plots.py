@@ -0,0 +1,163 @@
+"""
+Optional plotting layer.
+
+matplotlib is only imported when a figure is actually drawn. When a
+figure has an output path it is rendered with the non-interactive Agg
+backend and written to file, so batch jobs never block on plt.show().
+
+Draw cost is kept bounded by the data going in, not the data available:
+line series longer than MAX_POINTS are cut down with LTTB (largest
+triangle three buckets, which keeps the visual shape: peaks, troughs and
+turns) or per-bucket min / max, and dense scatters keep one point per
+occupied grid cell and colour. render_figures takes a batch of figure
+jobs and, when they go to files and workers are asked for, draws them in
+a few freshly spawned processes (never forked: the caller may already be
+running BLAS / k-means threads).
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MAX_POINTS = 2000 # points kept per line series (a few per pixel at the default size)
+SCATTER_BINS = 200 # grid cells per axis when thinning a scatter (a few pixels each)
+RENDER_WORKERS = 4 # most processes for one batch of figures (each imports matplotlib)
+
+
+# 'pyplot' imports matplotlib.pyplot on first use, selecting the Agg backend when headless
+def pyplot(headless=False):
+    import matplotlib
+    if headless:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# 'figure_path' returns where to write a named figure, or None to show it interactively
+def figure_path(figures, name):
+    return os.path.join(figures, name + '.png') if figures else None
+
+
+# 'finish' writes the current figure to 'out' and closes it, or shows it if 'out' is None
+def finish(plt, out=None):
+    if out:
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        plt.savefig(out, bbox_inches='tight')
+        plt.close()
+    else:
+        plt.show()
+
+
+# 'as_numeric' returns x as float64 (datetimes as nanoseconds) for the downsampling geometry
+def as_numeric(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+# 'lttb' returns the indices of n points that keep the shape of y over x
+# (largest triangle three buckets); every index when n >= len(y)
+def lttb(x, y, n):
+    size = len(y)
+    if n >= size or n < 3:
+        return np.arange(size)
+    x, y = as_numeric(x), np.asarray(y, dtype=np.float64)
+    # first and last points are kept; the rest fall into n - 2 equal buckets
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    keep = np.empty(n, dtype=np.int64)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 2 < n - 1 else size)
+        # pick the point forming the largest triangle with the last pick and the next bucket's mean
+        area = np.abs((x[a] - x[nxt].mean()) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (y[nxt].mean() - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+# 'minmax' returns the indices of each bucket's lowest and highest point (about n in all, in order)
+def minmax(y, n):
+    size = len(y)
+    buckets = n // 2
+    if n >= size or buckets < 1:
+        return np.arange(size)
+    y = np.asarray(y, dtype=np.float64)
+    width = size // buckets
+    blocks = y[:width * buckets].reshape(buckets, width)
+    offsets = np.arange(buckets) * width
+    picks = [offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1), [0, size - 1]]
+    if width * buckets < size: # the short tail bucket
+        tail = y[width * buckets:]
+        picks.append([width * buckets + tail.argmin(), width * buckets + tail.argmax()])
+    return np.unique(np.concatenate(picks))
+
+
+# 'downsample' returns (x, y) cut to about 'max_points' points with 'method' ('lttb' or 'minmax')
+def downsample(x, y, max_points=MAX_POINTS, method='lttb'):
+    x, y = np.asarray(x), np.asarray(y)
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    keep = lttb(x, y, max_points) if method == 'lttb' else minmax(y, max_points)
+    return x[keep], y[keep]
+
+
+# 'thin_scatter' returns the indices of one point per occupied (grid cell, colour) pair, in input
+# order, so a dense scatter keeps its footprint and every cluster's outline at a bounded size;
+# each cell keeps its last point, the one drawn on top, so overlaps stack as before
+def thin_scatter(x, y, c=None, bins=SCATTER_BINS):
+    x, y = as_numeric(x), as_numeric(y)
+    cells = []
+    for v in (x, y):
+        lo, hi = np.nanmin(v), np.nanmax(v)
+        cells.append(np.clip(((v - lo) / ((hi - lo) or 1) * bins).astype(np.int64), 0, bins - 1))
+    key = cells[0] * bins + cells[1]
+    if c is not None:
+        _, codes = np.unique(np.asarray(c), return_inverse=True)
+        key = key * (codes.max() + 1) + codes
+    _, last = np.unique(key[::-1], return_index=True)
+    return np.sort(len(key) - 1 - last)
+
+
+# 'render_job' runs in a pool process: draw one figure headless to its file
+def render_job(job):
+    fn, args, out = job
+    fn(*args, out=out)
+    return out
+
+
+# 'render_figures' draws a batch of figure jobs ([(name, plot function, args), ...]). With a
+# 'figures' directory they are written headless as <name>.png, in this process unless
+# 'max_workers' asks for more (then in up to RENDER_WORKERS spawned processes); without one they
+# are shown in order. Returns the files written
+def render_figures(jobs, figures=None, max_workers=None):
+    if not figures:
+        for _, fn, args in jobs:
+            fn(*args, out=None)
+        return []
+    work = [(fn, args, figure_path(figures, name)) for name, fn, args in jobs]
+    workers = min(max_workers or 1, RENDER_WORKERS, len(work))
+    if workers <= 1:
+        return [render_job(job) for job in work]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(render_job, work))
+
+
+# 'plot_investments' plots investment values over time; 'series' is a list of (values, color, label),
+# each cut to 'max_points' shape-preserving points first
+def plot_investments(dates, series, out=None, max_points=MAX_POINTS):
+    plt = pyplot(headless=out is not None)
+    plt.figure()
+    for values, color, label in series:
+        x, y = downsample(dates, values, max_points)
+        plt.plot(x, y, color=color, label=label)
+    plt.xlabel('Date')
+    plt.ylabel('Investment Value ($USD)')
+    plt.title('Investment Returns Based on Prediction Models')
+    plt.legend()
+    plt.grid(True)
+    finish(plt, out)
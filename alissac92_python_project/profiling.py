@@ -0,0 +1,174 @@
+"""
+Stage-level profiling: named timers, per-stage peak memory and counters.
+
+Profiling is off by default. While off, 'stage' hands back one shared
+no-op context and 'count' returns after a single attribute check, so the
+instrumented code pays next to nothing. Once enabled, every stage records
+its calls and wall time, and (with memory=True) the peak bytes that
+tracemalloc saw allocated above the stage's starting point; stages nest,
+and an inner stage's peak also counts towards every stage around it.
+Counters are plain named totals (rows read, pattern lookups, ...).
+
+Stage timings and the final summary go to the 'alissac92_python_project.
+profiling' logger (DEBUG per stage, INFO for the summary) rather than to
+stdout, and 'dump' writes the whole profile as JSON for a scheduler to
+track throughput per stage over time. Work done inside pool processes is
+only seen as the parent stage that waits on it, plus whatever timings the
+workers send back and the parent passes to 'record'.
+
+    python -m alissac92_python_project --log-level INFO pipeline DIR --profile profile.json [--profile-memory]
+"""
+
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+_OFF = contextlib.nullcontext()
+
+
+class Profiler:
+    # stage timings, peak memory and counters for one run
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.stages = {} # name -> {'calls', 'seconds', 'peak_bytes'}, in first-seen order
+        self.counters = {}
+        self.open = [] # [name, start, base bytes, peak bytes] for every stage being timed
+
+    # 'enable' starts recording (memory=True also tracks peak allocations with tracemalloc)
+    def enable(self, memory=False):
+        self.enabled, self.memory = True, memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # 'disable' stops recording, keeping what was recorded
+    def disable(self):
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.enabled = False
+
+    # 'reset' forgets every stage and counter
+    def reset(self):
+        self.stages, self.counters, self.open = {}, {}, []
+
+    # 'fold_peak' credits the peak since the last call to every open stage and returns current bytes
+    def fold_peak(self):
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self.open:
+            frame[3] = max(frame[3], peak)
+        tracemalloc.reset_peak()
+        return current
+
+    # 'stage' times the block under 'name' (a no-op while disabled)
+    def stage(self, name):
+        return self.timed(name) if self.enabled else _OFF
+
+    # 'timed' records one run of the block under 'name'
+    @contextlib.contextmanager
+    def timed(self, name):
+        base = self.fold_peak() if self.memory else 0
+        frame = [name, time.perf_counter(), base, base]
+        self.open.append(frame)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - frame[1]
+            if self.memory:
+                self.fold_peak()
+            self.open.remove(frame)
+            stats = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_bytes': 0})
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['peak_bytes'] = max(stats['peak_bytes'], frame[3] - frame[2])
+            log.debug('stage %s: %.4fs', name, seconds)
+
+    # 'record' adds a timing measured elsewhere (e.g. inside a pool process) under stage 'name'
+    def record(self, name, seconds, calls=1):
+        if self.enabled:
+            stats = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_bytes': 0})
+            stats['calls'] += calls
+            stats['seconds'] += seconds
+
+    # 'count' adds n to counter 'name' (a no-op while disabled)
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # 'table' returns one row per stage: calls, seconds, peak MB and throughput of 'rows_counter'
+    def table(self, rows_counter='rows'):
+        table = pd.DataFrame.from_dict(self.stages, orient='index', columns=['calls', 'seconds', 'peak_bytes'])
+        table.index.name = 'Stage'
+        table['peak_mb'] = table.pop('peak_bytes') / 2**20
+        rows = self.counters.get(rows_counter, 0)
+        table['rows_per_sec'] = [rows / s if s else 0.0 for s in table['seconds']]
+        return table
+
+    # 'to_dict' returns the whole profile as JSON-ready data
+    def to_dict(self):
+        return {
+            'created': time.time(),
+            'argv': sys.argv,
+            'pid': os.getpid(),
+            'memory_tracked': self.memory,
+            'max_rss_mb': max_rss_mb(),
+            'stages': self.stages,
+            'counters': self.counters,
+        }
+
+    # 'dump' writes the profile to 'path' as JSON, atomically (temp file + rename)
+    def dump(self, path):
+        tmp = path + '.tmp{}'.format(os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+        return path
+
+
+# 'max_rss_mb' returns this process's peak resident set size in MB, or None where the
+# Unix-only 'resource' module is missing (Windows)
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 2**10 # bytes on macOS, KB elsewhere
+
+
+# the process-wide profiler the pipelines report to
+PROFILER = Profiler()
+stage = PROFILER.stage
+record = PROFILER.record
+count = PROFILER.count
+
+
+# 'add_arguments' adds the --profile / --profile-memory options to a command's parser
+def add_arguments(parser):
+    parser.add_argument('--profile', metavar='JSON', help='time every stage and write the profile to JSON')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='with --profile, also track peak memory per stage (slower)')
+
+
+# 'session' enables profiling for the block when 'path' is set, then logs the summary and
+# writes the JSON profile; without a path the block runs unprofiled
+@contextlib.contextmanager
+def session(path=None, memory=False, profiler=PROFILER):
+    if not path:
+        yield profiler
+        return
+    profiler.reset()
+    profiler.enable(memory)
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        log.info('profile (counters %s):\n%s', profiler.counters, profiler.table().to_string())
+        log.info('wrote profile to %s', profiler.dump(path))
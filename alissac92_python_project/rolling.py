@@ -0,0 +1,182 @@
+"""
+O(n) rolling-indicator engine.
+
+Works on 2-D (ticker x time) arrays, one row per ticker; a 1-D series is
+treated as a single row. Windowed sums come from cumulative sums, so each
+window length costs one subtraction per cell whatever its size, and every
+window shares the same three cumulative passes (count, sum, sum of
+squares). Values are centred on each row's mean before summing to keep
+the variance formula stable, and NaNs count as missing.
+
+RollingWindows is the streaming counterpart: a ring buffer of the last
+max(windows) values per ticker, updated one time step at a time, for
+appending new days without recomputing history.
+
+Indicators for window w (all from days t-w+1..t, or t-w..t-1 with lag=1):
+
+    MA{w}   moving average of the price
+    Vol{w}  standard deviation of the daily return (ddof=1)
+    Up{w}   share of days whose return was >= 0
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# 'as_2d' returns a float64 (series x time) array and whether the input was 1-D
+def as_2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    return (x[None, :], True) if x.ndim == 1 else (x, False)
+
+
+# 'window_diff' returns c[:, t + 1] - c[:, t + 1 - w] for every t (clipped at the series start)
+def window_diff(c, w):
+    out = np.empty((c.shape[0], c.shape[1] - 1))
+    head = min(w, c.shape[1]) # the first w - 1 cells start at the series start
+    out[:, :head - 1] = c[:, 1:head] - c[:, :1]
+    out[:, head - 1:] = c[:, head:] - c[:, :c.shape[1] - head]
+    return out
+
+
+# 'rolling_moments' returns {w: (count, mean, std)} for every window length, each (series x time);
+# cells with fewer than 'min_periods' values (default: the full window) are NaN
+def rolling_moments(x, windows, min_periods=None, ddof=1):
+    x, flat = as_2d(x)
+    valid = ~np.isnan(x)
+    with np.errstate(invalid='ignore'):
+        shift = np.nan_to_num(np.nanmean(np.where(valid, x, np.nan), axis=1, keepdims=True))
+    xs = np.where(valid, x - shift, 0.0)
+    zero = np.zeros((x.shape[0], 1))
+    c0 = np.concatenate([zero, np.cumsum(valid, axis=1)], axis=1)
+    c1 = np.concatenate([zero, np.cumsum(xs, axis=1)], axis=1)
+    c2 = np.concatenate([zero, np.cumsum(xs * xs, axis=1)], axis=1)
+
+    out = {}
+    for w in windows:
+        n = window_diff(c0, w)
+        s1 = window_diff(c1, w)
+        s2 = window_diff(c2, w)
+        need = w if min_periods is None else min_periods
+        enough = n >= max(need, 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(enough, s1 / n + shift, np.nan)
+            var = np.maximum(s2 - s1 * s1 / n, 0) / (n - ddof)
+            std = np.where(enough & (n > ddof), np.sqrt(var), np.nan)
+        if flat:
+            n, mean, std = n[0], mean[0], std[0]
+        out[w] = (n, mean, std)
+    return out
+
+
+# 'rolling_mean' returns {w: moving average} for every window length
+def rolling_mean(x, windows, min_periods=None):
+    return {w: m for w, (_, m, _) in rolling_moments(x, windows, min_periods).items()}
+
+
+# 'rolling_std' returns {w: rolling standard deviation} for every window length
+def rolling_std(x, windows, min_periods=None, ddof=1):
+    return {w: s for w, (_, _, s) in rolling_moments(x, windows, min_periods, ddof).items()}
+
+
+# 'up_ratio' returns {w: share of days with return >= 0} for every window length
+def up_ratio(returns, windows, min_periods=None):
+    returns = np.asarray(returns, dtype=np.float64)
+    up = np.where(np.isnan(returns), np.nan, (returns >= 0).astype(np.float64))
+    return rolling_mean(up, windows, min_periods)
+
+
+# 'lagged' shifts every row right by 'lag' steps (NaN-filled), so day t only sees days before it
+def lagged(x, lag=1):
+    if lag == 0:
+        return x
+    out = np.full(x.shape, np.nan)
+    out[..., lag:] = x[..., :-lag]
+    return out
+
+
+# 'indicators' returns {'MA{w}' / 'Vol{w}' / 'Up{w}': array} for every window, from price and
+# return arrays of the same (series x time) shape; lag=1 makes them usable as predictor inputs
+def indicators(prices, returns, windows, min_periods=None, lag=0):
+    feats = {}
+    for w, ma in rolling_mean(prices, windows, min_periods).items():
+        feats['MA{}'.format(w)] = lagged(ma, lag)
+    for w, vol in rolling_std(returns, windows, min_periods).items():
+        feats['Vol{}'.format(w)] = lagged(vol, lag)
+    for w, up in up_ratio(returns, windows, min_periods).items():
+        feats['Up{}'.format(w)] = lagged(up, lag)
+    return feats
+
+
+# 'indicator_frame' returns one ticker's indicators as columns aligned with its rows
+def indicator_frame(df, windows=(5, 14, 50), price='Adj Close', returns='Return', min_periods=None, lag=1):
+    feats = indicators(df[price].to_numpy(), df[returns].to_numpy(), windows, min_periods, lag)
+    return pd.DataFrame(feats, index=df.index)
+
+
+# 'panel' lines up one column of many tickers' frames by date into a (ticker x date) array
+def panel(frames, column, date='Date'):
+    wide = pd.concat({t: df.set_index(date)[column] for t, df in frames.items()}, axis=1).sort_index()
+    return wide.to_numpy(dtype=np.float64).T, list(wide.columns), wide.index
+
+
+class RollingWindows:
+    # ring buffer of the last max(windows) values per series, with running count / sum / sum of
+    # squares per window, so each new time step costs O(series x windows). The sums are of values
+    # shifted by a per-window reference (the window mean at the last resync), which keeps the
+    # variance from cancelling on raw price levels, and every w pushes window w's sums are
+    # recomputed exactly from the buffer so rounding error cannot build up over a long stream
+    def __init__(self, n_series, windows):
+        self.windows = sorted(windows)
+        self.size = self.windows[-1]
+        self.buf = np.full((n_series, self.size), np.nan)
+        self.pos = 0 # slot the next value goes into
+        self.steps = 0 # values pushed so far
+        self.ref = {w: np.zeros(n_series) for w in self.windows}
+        self.n = {w: np.zeros(n_series) for w in self.windows}
+        self.s1 = {w: np.zeros(n_series) for w in self.windows}
+        self.s2 = {w: np.zeros(n_series) for w in self.windows}
+
+    # 'resync' recomputes window w's count and shifted sums from the last w buffered values,
+    # re-centring its reference on their mean
+    def resync(self, w):
+        last = self.buf[:, (self.pos - 1 - np.arange(w)) % self.size]
+        ok = ~np.isnan(last)
+        n = ok.sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            ref = np.where(n > 0, np.nansum(last, axis=1) / np.maximum(n, 1), 0.0)
+        d = np.where(ok, last - ref[:, None], 0.0)
+        self.ref[w], self.n[w] = ref, n.astype(float)
+        self.s1[w], self.s2[w] = d.sum(axis=1), (d * d).sum(axis=1)
+
+    # 'push' adds one value per series (NaN = missing) and returns {w: (count, mean, std)}
+    def push(self, values, min_periods=None, ddof=1):
+        values = np.asarray(values, dtype=np.float64)
+        new_ok = ~np.isnan(values)
+        for w in self.windows:
+            # a window with no values yet takes its first value as the reference
+            ref = self.ref[w] = np.where(new_ok & (self.n[w] == 0), values, self.ref[w])
+            # the value leaving window w was pushed w steps ago (NaN if it never existed)
+            old = self.buf[:, (self.pos - w) % self.size]
+            old_ok = ~np.isnan(old)
+            new = np.where(new_ok, values - ref, 0.0)
+            old = np.where(old_ok, old - ref, 0.0)
+            self.n[w] += new_ok.astype(float) - old_ok
+            self.s1[w] += new - old
+            self.s2[w] += new * new - old * old
+        self.buf[:, self.pos] = values
+        self.pos = (self.pos + 1) % self.size
+        self.steps += 1
+
+        out = {}
+        for w in self.windows:
+            if self.steps % w == 0:
+                self.resync(w)
+            n, s1, s2 = self.n[w], self.s1[w], self.s2[w]
+            need = w if min_periods is None else min_periods
+            enough = n >= max(need, 1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(enough, s1 / n + self.ref[w], np.nan)
+                var = np.maximum(s2 - s1 * s1 / n, 0) / (n - ddof)
+                std = np.where(enough & (n > ddof), np.sqrt(var), np.nan)
+            out[w] = (n.copy(), mean, std)
+        return out
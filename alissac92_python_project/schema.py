@@ -0,0 +1,86 @@
+"""
+Schema-driven, memory-lean CSV loading.
+
+A schema maps each column to the dtype it should be held in: a NumPy
+dtype name ('float32', 'int8', ...), 'category' for repeated strings, or
+'date' for ISO dates parsed natively into datetime64. read_schema reads
+only the columns a stage asks for, already in those dtypes, through the
+binary CSV cache. memory_report compares the result with what a default
+pd.read_csv of the whole file would hold.
+"""
+
+import os
+
+import pandas as pd
+
+from .csv_cache import read_csv_cached
+
+# the ticker CSVs (SPY.csv schema); Return stays float64 because backtests compound it
+PRICE_SCHEMA = {
+    'Date': 'date',
+    'Year': 'int16',
+    'Month': 'int8',
+    'Day': 'int8',
+    'Weekday': 'category',
+    'Week_Number': 'int8',
+    'Year_Week': 'category',
+    'Open': 'float32',
+    'High': 'float32',
+    'Low': 'float32',
+    'Close': 'float32',
+    'Volume': 'int64',
+    'Adj Close': 'float32',
+    'Return': 'float64',
+    'Short_MA': 'float32',
+    'Long_MA': 'float32',
+}
+
+# columns the return-pattern stages (report, pipeline, sweep) actually read
+PATTERN_COLUMNS = ['Date', 'Year', 'Return']
+
+# the credit card transactions (creditcard_2023.csv schema); only the measurements and the
+# class are downcast, the row id stays int64 so large files keep their ids exact
+FRAUD_SCHEMA = dict({'id': 'int64'}, **{'V{}'.format(i): 'float32' for i in range(1, 29)},
+                    Amount='float32', Class='int8')
+
+
+# 'read_args' turns the schema entries for 'columns' into pd.read_csv arguments
+def read_args(schema, columns):
+    missing = [c for c in columns if c not in schema]
+    if missing:
+        raise KeyError('columns not in schema: {}'.format(missing))
+    return {
+        'usecols': list(columns),
+        'dtype': {c: schema[c] for c in columns if schema[c] != 'date'},
+        'parse_dates': [c for c in columns if schema[c] == 'date'],
+    }
+
+
+# 'read_schema' reads just 'columns' (default: every schema column) of a CSV in their schema
+# dtypes, in the order asked for; 'cached=False' bypasses the binary cache
+def read_schema(path, schema, columns=None, cached=True, **read_kwargs):
+    columns = list(schema) if columns is None else list(columns)
+    kwargs = dict(read_args(schema, columns), **read_kwargs)
+    df = read_csv_cached(path, **kwargs) if cached else pd.read_csv(path, **kwargs)
+    return df[columns]
+
+
+# 'frame_bytes' returns a frame's in-memory size, counting string contents
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+# 'default_bytes' estimates what pd.read_csv(path) with default dtypes would hold, from the
+# per-row size of its first 'nrows' rows
+def default_bytes(path, rows, nrows=10_000):
+    head = pd.read_csv(path, nrows=nrows)
+    return int(frame_bytes(head) / max(len(head), 1) * rows), len(head.columns)
+
+
+# 'memory_report' returns a one-line summary of a lean frame's footprint against the default read
+def memory_report(path, df):
+    before, n_cols = default_bytes(path, len(df))
+    after = frame_bytes(df)
+    saved = 1 - after / before if before else 0.0
+    return '{}: {:,} rows, {} cols {:.2f} MB (default read, est.) -> {} cols {:.2f} MB ({:.0%} less)'.format(
+        os.path.basename(path), len(df), n_cols, before / 2 ** 20, len(df.columns), after / 2 ** 20, saved)
@@ -0,0 +1,104 @@
+"""
+Parameter sweep over window length, decision threshold and ensemble rule.
+
+One walk-forward pass produces P('+' next) for every window W in 1..K
+from a single shared set of pattern counts. Every grid point (threshold,
+subset of windows, k-of-n vote) is then just a comparison and a column
+sum over that probability matrix, and the whole grid is scored and
+backtested in one vectorized batch.
+"""
+
+import argparse
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .schema import PRICE_SCHEMA, PATTERN_COLUMNS, read_schema
+from .labels import tru_lbl
+from .walk_forward import walk_forward_probs
+from .evaluate import confusion_table
+from .backtest import backtest
+from .pipeline import test_start
+
+
+# 'window_subsets' lists every non-empty subset of windows up to 'max_size' windows
+def window_subsets(windows, max_size=None):
+    max_size = max_size or len(windows)
+    return [s for size in range(1, max_size + 1) for s in combinations(windows, size)]
+
+
+# 'sweep_grid' scores every (threshold, window subset, k-of-n vote) configuration
+# 'probs' holds one column of walk-forward probabilities per entry of 'windows'
+def sweep_grid(probs, truth, returns, windows, thresholds, max_size=None, rank_by='Accuracy'):
+    windows = list(windows)
+    thresholds = np.asarray(thresholds, dtype=float)
+    subsets = window_subsets(windows, max_size)
+
+    # membership matrix: column s marks which windows belong to subset s
+    member = np.zeros((len(windows), len(subsets)), dtype=np.int16)
+    for s, subset in enumerate(subsets):
+        for w in subset:
+            member[windows.index(w), s] = 1
+    # up-votes per (day, threshold, subset) in one pass
+    votes = (probs[:, None, :] > thresholds[None, :, None]).astype(np.int16) @ member
+
+    t_idx, s_idx, k_idx = [], [], []
+    for t in range(len(thresholds)):
+        for s, subset in enumerate(subsets):
+            for k in range(1, len(subset) + 1):
+                t_idx.append(t)
+                s_idx.append(s)
+                k_idx.append(k)
+    t_idx, s_idx, k_idx = np.array(t_idx), np.array(s_idx), np.array(k_idx)
+    preds = (votes[:, t_idx, s_idx] >= k_idx).astype(np.int8)
+
+    configs = pd.DataFrame({
+        'Windows': ['+'.join('W{}'.format(w) for w in subsets[s]) for s in s_idx],
+        'Rule': ['{}-of-{}'.format(k, len(subsets[s])) for s, k in zip(s_idx, k_idx)],
+        'Threshold': thresholds[t_idx],
+    })
+    scores = confusion_table(truth, preds, names=configs.index)
+    _, stats = backtest(returns, preds, names=configs.index, hold=False)
+    results = configs.join(scores).join(stats)
+    return results.sort_values(rank_by, ascending=False, kind='stable').reset_index(drop=True)
+
+
+# 'sweep_frame' runs the grid for one ticker's dataframe, testing from 'test_year' on
+def sweep_frame(df, max_w=4, thresholds=(0.45, 0.50, 0.55), max_size=None, test_year=2019,
+                rank_by='Accuracy'):
+    df = tru_lbl(df)
+    start = test_start(df, test_year)
+    windows = list(range(1, max_w + 1))
+    with profiling.stage('walk_forward'):
+        probs = walk_forward_probs(df['True Return'].to_numpy(), windows, start=start)
+    profiling.count('predictions', probs.size)
+    test = df.iloc[start:]
+    with profiling.stage('grid'):
+        return sweep_grid(probs, test['True Return'].to_numpy(), test['Return'].to_numpy(),
+                          windows, thresholds, max_size, rank_by)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sweep window length, threshold and voting rule.')
+    parser.add_argument('csv', help='ticker CSV in the SPY.csv schema')
+    parser.add_argument('--max-w', type=int, default=4)
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.45, 0.50, 0.55])
+    parser.add_argument('--max-size', type=int, default=None, help='largest window subset to vote over')
+    parser.add_argument('--test-year', type=int, default=2019)
+    parser.add_argument('--rank-by', default='Accuracy')
+    parser.add_argument('--top', type=int, default=20)
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profiling.session(args.profile, args.profile_memory):
+        with profiling.stage('load'):
+            df = read_schema(args.csv, PRICE_SCHEMA, PATTERN_COLUMNS)
+        profiling.count('rows', len(df))
+        results = sweep_frame(df, args.max_w, args.thresholds, args.max_size, args.test_year, args.rank_by)
+        print(results.head(args.top).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Synthetic data generators for benchmarking.
+
+make_prices builds seeded daily price series in the SPY.csv schema and
+make_transactions builds seeded fraud-style data in the
+creditcard_2023.csv shape (id, V1..V28, Amount, Class), both at any size.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Date', 'Year', 'Month', 'Day', 'Weekday', 'Week_Number', 'Year_Week',
+                 'Open', 'High', 'Low', 'Close', 'Volume', 'Adj Close', 'Return',
+                 'Short_MA', 'Long_MA']
+FRAUD_FEATURES = ['V{}'.format(i) for i in range(1, 29)]
+
+
+# 'make_prices' returns one ticker's random-walk price history in the SPY.csv schema
+# Short_MA / Long_MA are 14- and 50-day means of Adj Close, as in the bundled CSVs
+def make_prices(n_days, seed=0, start='2016-01-04', price=100.0, drift=0.0004, vol=0.01):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days)
+    ret = rng.normal(drift, vol, n_days)
+    ret[0] = 0.0
+    adj_close = np.round(price * np.cumprod(1 + ret), 2)
+    close = np.round(adj_close * 1.12, 2) # unadjusted close sits above the adjusted one
+    open_ = np.round(close * (1 + rng.normal(0, vol / 2, n_days)), 2)
+    spread = np.abs(rng.normal(0, vol / 2, n_days))
+    adj = pd.Series(adj_close)
+    return pd.DataFrame({
+        'Date': dates.strftime('%Y-%m-%d'),
+        'Year': dates.year,
+        'Month': dates.month,
+        'Day': dates.day,
+        'Weekday': dates.day_name(),
+        'Week_Number': dates.strftime('%W').astype(int),
+        'Year_Week': dates.strftime('%Y-%W'),
+        'Open': open_,
+        'High': np.round(np.maximum(open_, close) * (1 + spread), 2),
+        'Low': np.round(np.minimum(open_, close) * (1 - spread), 2),
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 200_000_000, n_days),
+        'Adj Close': adj_close,
+        'Return': adj.pct_change().fillna(0.0).to_numpy(),
+        'Short_MA': adj.rolling(14, min_periods=1).mean().to_numpy(),
+        'Long_MA': adj.rolling(50, min_periods=1).mean().to_numpy(),
+    }, columns=PRICE_COLUMNS)
+
+
+# 'write_prices' writes 'n_tickers' synthetic CSVs (T0000.csv, ...) into out_dir and returns their paths
+def write_prices(out_dir, n_tickers, n_days, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for t in range(n_tickers):
+        path = os.path.join(out_dir, 'T{:04d}.csv'.format(t))
+        make_prices(n_days, seed=seed + t).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# 'make_transactions' returns fraud-style rows: standardized V1..V28 features whose means
+# shift with Class (most strongly V4, V11, V2, V19, V27), a positive Amount and a 0/1 Class
+def make_transactions(n_rows, seed=0, fraud_ratio=0.5):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n_rows) < fraud_ratio).astype(np.int64)
+    shift = rng.normal(0, 0.3, len(FRAUD_FEATURES))
+    for name, s in (('V4', 1.4), ('V11', 1.3), ('V2', 1.0), ('V19', 0.6), ('V27', 0.4)):
+        shift[FRAUD_FEATURES.index(name)] = s
+    X = rng.normal(size=(n_rows, len(FRAUD_FEATURES))) + (y[:, None] - 0.5) * shift
+    df = pd.DataFrame(X, columns=FRAUD_FEATURES)
+    df.insert(0, 'id', np.arange(n_rows))
+    df['Amount'] = np.round(rng.uniform(50, 24000, n_rows), 2)
+    df['Class'] = y
+    return df
+
+
+# 'write_transactions' writes a synthetic creditcard_2023.csv-shaped file and returns its path
+def write_transactions(path, n_rows, seed=0):
+    make_transactions(n_rows, seed=seed).to_csv(path, index=False)
+    return path
@@ -0,0 +1,31 @@
+"""
+Walk-forward up/down predictor.
+
+Steps through a label series once, predicting each day from pattern
+counts over strictly earlier days and then folding that day's true
+label into the counts, so a full pass is linear in the series length.
+"""
+
+import numpy as np
+from .labels import lbl_bits
+from .pattern_index import PatternIndex
+
+
+# 'walk_forward_probs' returns P('+' next) for every day from 'start' on and every window
+# in 'windows' (one column each), all read from a single shared set of pattern counts
+def walk_forward_probs(labels, windows, start=0):
+    windows = list(windows)
+    bits = lbl_bits(labels)
+    idx = PatternIndex(bits[:start], max_k=max(windows) + 1) # counts from the days before 'start'
+    probs = np.zeros((len(bits) - start, len(windows)))
+    for i, bit in enumerate(bits[start:].tolist()):
+        for j, w in enumerate(windows):
+            probs[i, j] = idx.next_prob(w)
+        idx.append(bit) # the day's outcome becomes history for tomorrow
+    return probs
+
+
+# 'walk_forward' predicts labels[start:] (as int8 0/1) using a W-day history and only past data
+def walk_forward(labels, w, start=0, threshold=0.50):
+    probs = walk_forward_probs(labels, [w], start)[:, 0]
+    return (probs > threshold).astype(np.int8)
@@ -0,0 +1,11 @@
+"""
+Credit card fraud classification and clustering.
+
+Importing the package has no side effects; plots.py imports matplotlib
+and seaborn only when a figure is drawn. Command-line entry points:
+
+    python -m alissac92_python_project2 [--data PATH] [--figures DIR | --no-plots] [--save-models DIR]
+    python -m alissac92_python_project2 score MODELS_DIR transactions.csv [--out scored.csv]
+    python -m alissac92_python_project2 latency MODELS_DIR transactions.csv [--batch 1 32]
+    python -m alissac92_python_project2 cv [--data PATH] [--folds 5] [--workers N]
+"""
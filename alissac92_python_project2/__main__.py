@@ -0,0 +1,37 @@
+"""
+Command-line entry point: python -m alissac92_python_project2 [command] [options]
+
+Without a command (or with 'report') the full classification and
+clustering report runs, as before. A leading --log-level LEVEL sets the
+level for diagnostics and profiles (default: WARNING).
+"""
+
+import importlib
+import logging
+import sys
+
+# command name -> module whose main(argv) runs it (imported only when chosen)
+COMMANDS = {
+    'report': 'acrist_term_project',
+    'score': 'score',
+    'latency': 'fast_scorer',
+    'cv': 'cv',
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    level = 'WARNING'
+    if argv[:1] == ['--log-level'] and len(argv) > 1:
+        level = argv[1].upper()
+        argv = argv[2:]
+    logging.basicConfig(level=level, format='%(levelname)s %(name)s: %(message)s')
+    command = 'report'
+    if argv and argv[0] in COMMANDS:
+        command = argv.pop(0)
+    module = importlib.import_module('.' + COMMANDS[command], __package__)
+    return module.main(argv)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
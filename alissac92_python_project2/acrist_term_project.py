@@ -1,4 +1,4 @@
-""" 
+"""
 Alissa Crist
 Description of Problem:
 This program takes a fictional, anonymized dataset of credit
@@ -6,316 +6,249 @@ card transactions and implements various classification models
 to predict whether a transaction will be fraud or not. Methods
 used include logistic regression, k-NN, Naive Bayes, Decision Tree
 and clustering with k-means.
+
+Run from the repository root with:
+    python -m alissac92_python_project2 [--data creditcard_2023.csv] [--figures DIR | --no-plots] [--profile JSON]
 """
 
+import argparse
+import os
+
+import numpy as np
 import pandas as pd
-import random
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.naive_bayes import GaussianNB
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.cluster import KMeans
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, confusion_matrix
+from sklearn.pipeline import make_pipeline
 
-# --- PROJECT SETUP --- #
+from alissac92_python_project import profiling
+from alissac92_python_project.evaluate import confusion_table
+from alissac92_python_project.plots import RENDER_WORKERS, render_figures
+from alissac92_python_project.schema import FRAUD_SCHEMA, read_schema, memory_report
+
+from .artifacts import save_artifacts, slug
+from .clustering import knee_sse, cluster_all
+from .feature_rank import csv_chunks, frame_chunks, target_correlation, top_features, correlation_matrix
+from .model_zoo import run_zoo
+from .sampling import reservoir_sample
+from .stream_stats import stream_class_stats
 
-# read csv into df and print head
-fraud_df = pd.read_csv("creditcard_2023.csv", sep=",")
-print(fraud_df.head())
-
-# describe data
-print(fraud_df.describe().T)
-
-# check for null values
-print(fraud_df.isnull().sum())
-
-# create subset of fraud_df for class = 0 (Not Fraud)
-fraud_df_0 = fraud_df[fraud_df['Class'] == 0]
-print(fraud_df_0)
-
-# create subset of fraud_df for class = 1 (Fraud)
-fraud_df_1 = fraud_df[fraud_df['Class'] == 1]
-print(fraud_df_1)
-
-# print mean and sd for all classes
-print("\nMean and SD for all classes:\n")
-print("Mean\n")
-print(fraud_df.mean(axis=0, numeric_only=True))
-print("\nSD\n")
-print(fraud_df.std(axis=0, numeric_only=True))
-
-# print mean and sd for class = 0 (Not Fraud)
-print("\nMean and SD for Class = 0:\n")
-print("Mean\n")
-print(fraud_df_0.mean(axis=0, numeric_only=True))
-print("\nSD\n")
-print(fraud_df_0.std(axis=0, numeric_only=True))
-
-# print mean and sd for class = 1 (Fraud)
-print("\nMean and SD for class = 1:\n")
-print("Mean\n")
-print(fraud_df_1.mean(axis=0, numeric_only=True))
-print("\nSD\n")
-print(fraud_df_1.std(axis=0, numeric_only=True))
-
-# drop 'id' column for corr matrix
-fraud_df2 = fraud_df.drop(columns=['id'])
-
-# create corr matrix for features/target class in sorted order (highest first)
-correlation_matrix = fraud_df2.corr()
-correlation_with_target = correlation_matrix['Class'].sort_values(ascending=False)
-
-# select top 10 features based on corr with the target variable
-top_features = correlation_with_target.index[:11]
-# create corr matrix for top features
-correlation_matrix_top = fraud_df2[top_features].corr()
-
-# create and plot heatmap
-plt.figure(figsize=(10, 8))
-sns.heatmap(correlation_matrix_top, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5)
-plt.title('Correlation Heatmap of Features to Target Class')
-plt.show()
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'creditcard_2023.csv')
 
 # V4, 11, 2, 19, 27 are top correlated features
+FEATURES = ['V4', 'V11', 'V2', 'V19', 'V27']
+
+# figure file for each model's confusion matrix (any other model: its slug)
+MODEL_FIGURES = {'Logistic Regression': 'logistic_regression', 'k-NN (k=3)': 'knn',
+                 'Naive Bayes': 'naive_bayes', 'Decision Tree': 'decision_tree'}
 
 # create labels for classes
 class_labels = {0: 'Class 0: No Fraud', 1: 'Class 1: Fraud'}
 
-# calc class distribution
-class_counts = fraud_df['Class'].value_counts()
-
-# create and show pie chart
-plt.figure(figsize=(10, 8))
-plt.pie(class_counts, labels=[class_labels[idx] for idx in class_counts.index], autopct='%1.1f%%',
-        startangle=90, colors=sns.color_palette('icefire'))
-plt.title('Class Distribution')
-plt.show()
-
-# feature scaling
-fraud_df_fts = fraud_df.drop('Class', axis=1)
-scaler = StandardScaler()
-fraud_df_scaled = scaler.fit_transform(fraud_df_fts)
-fraud_df_scaled = pd.DataFrame(fraud_df_scaled, columns=fraud_df_fts.columns)
-
-# initialize features (X) and target class (y)
-X = fraud_df_scaled[['V4', 'V11', 'V2', 'V19', 'V27']]
-y = fraud_df['Class'].ravel()
-
-# split testing and training data with a 70/30 ratio
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, stratify=y, random_state=92)
-
-# -- LOGISTIC REGRESSION -- #
-
-# create and fit logistic regression model
-log_rgsn_mdl = LogisticRegression()
-log_rgsn_mdl.fit(X_train, y_train)
-
-# predict class
-y_pred = log_rgsn_mdl.predict(X_test)
-
-# evaluate accuracy
-lr_accuracy = accuracy_score(y_test, y_pred)
-print(f"\nLogistic Regression Accuracy: {lr_accuracy:.2f}")
-
-# create and plot confusion matrix
-lr_mtx = confusion_matrix(y_test,y_pred)
-sns.heatmap(lr_mtx.T, square=True, annot=True, fmt='d', cbar=True)
-plt.title('Logistic Regression')
-plt.xlabel('true label')
-plt.ylabel('predicted label')
-plt.show()
-
-# Extract TP, FP, TN, FN from the confusion matrix
-TP = lr_mtx[1, 1]
-FP = lr_mtx[0, 1]
-TN = lr_mtx[0, 0]
-FN = lr_mtx[1, 0]
-
-# Print TP, FP, TN, FN, TPR, TNR
-print(f"True Positives (TP): {TP}")
-print(f"False Positives (FP): {FP}")
-print(f"True Negatives (TN): {TN}")
-print(f"False Negatives (FN): {FN}")
-print(f"TPR: {TP/(TP+FP):.2f}")
-print(f"TNR: {TN/(TN+FN):.2f}")
-
-# -- k-NN -- #
-
-# feature scaling for kNN
-scaler = StandardScaler()
-X_train_sc = scaler.fit_transform(X_train)
-X_test_sc = scaler.transform(X_test)
-
-# find optimal value for k
-k_values = range(1, 10)
-accuracies = []
-
-for k in k_values:
-    knn = KNeighborsClassifier(n_neighbors=k)
-    knn.fit(X_train, y_train)
-    y_pred = knn.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
-    accuracies.append(accuracy)
-
-plt.plot(k_values, accuracies, marker='o')
-plt.xlabel('Number of Neighbors (k)')
-plt.ylabel('Accuracy')
-plt.title('kNN: Accuracy vs. k')
-plt.show()
-
-# optimal k value is 3
-classifier = KNeighborsClassifier(n_neighbors=3)
-classifier.fit(X_train_sc, y_train)
-
-# make predictions
-y_pred = classifier.predict(X_test_sc)
-
-# create and plot confusion matrix
-knn_mtx = confusion_matrix(y_test, y_pred)
-sns.heatmap(knn_mtx.T, square=True, annot=True, fmt='d', cbar=True)
-plt.title('K-NN (k=3)')
-plt.xlabel('true label')
-plt.ylabel('predicted label')
-plt.show()
-
-# Extract TP, FP, TN, FN from the confusion matrix
-TP = knn_mtx[1, 1]
-FP = knn_mtx[0, 1]
-TN = knn_mtx[0, 0]
-FN = knn_mtx[1, 0]
-
-# evaluate accuracy
-knn_accuracy = accuracy_score(y_test, y_pred)
-print(f"\nkNN Accuracy (k=3): {knn_accuracy:.2f}")
-
-# Print TP, FP, TN, FN, TPR, TNR
-print(f"True Positives (TP): {TP}")
-print(f"False Positives (FP): {FP}")
-print(f"True Negatives (TN): {TN}")
-print(f"False Negatives (FN): {FN}")
-print(f"TPR: {TP/(TP+FP):.2f}")
-print(f"TNR: {TN/(TN+FN):.2f}")
-
-# -- NAIVE BAYES -- #
-
-# create and fit NB model
-gnb_model = GaussianNB()
-gnb_model.fit(X_train, y_train)
-
-# predict labels on test set
-y_pred = gnb_model.predict(X_test)
-
-# create and plot confusion matrix
-gnb_mtx = confusion_matrix(y_test, y_pred)
-sns.heatmap(gnb_mtx.T, square=True, annot=True, fmt='d', cbar=True)
-plt.title('Naive Bayes')
-plt.xlabel('true label')
-plt.ylabel('predicted label')
-plt.show()
-
-# Extract TP, FP, TN, FN from the confusion matrix
-TP = gnb_mtx[1, 1]
-FP = gnb_mtx[0, 1]
-TN = gnb_mtx[0, 0]
-FN = gnb_mtx[1, 0]
-
-# evaluate accuracy
-gnb_accuracy = accuracy_score(y_test, y_pred)
-print(f"\nGaussian Naive Bayes' Accuracy: {gnb_accuracy:.2f}")
-
-# Print TP, FP, TN, FN, TPR, TNR
-print(f"True Positives (TP): {TP}")
-print(f"False Positives (FP): {FP}")
-print(f"True Negatives (TN): {TN}")
-print(f"False Negatives (FN): {FN}")
-print(f"TPR: {TP/(TP+FP):.2f}")
-print(f"TNR: {TN/(TN+FN):.2f}")
-
-# --- DECISION TREE ---
-
-# create and fit decision tree classifier
-dt = DecisionTreeClassifier(random_state=92)
-dt = dt.fit(X_train, y_train)
-
-# predict labels on test set
-y_pred = dt.predict(X_test)
-
-# create and plot confusion matrix
-dt_mtx = confusion_matrix(y_test, y_pred)
-sns.heatmap(dt_mtx.T, square=True, annot=True, fmt='d', cbar=True)
-plt.title('Decision Tree')
-plt.xlabel('true label')
-plt.ylabel('predicted label')
-plt.show()
-
-# Extract TP, FP, TN, FN from the confusion matrix
-TP = dt_mtx[1, 1]
-FP = dt_mtx[0, 1]
-TN = dt_mtx[0, 0]
-FN = dt_mtx[1, 0]
-
-# evaluate accuracy
-dt_accuracy = accuracy_score(y_test, y_pred)
-print(f"\nDecision Tree Accuracy: {dt_accuracy:.2f}")
-
-# Print TP, FP, TN, FN, TPR, TNR
-print(f"True Positives (TP): {TP}")
-print(f"False Positives (FP): {FP}")
-print(f"True Negatives (TN): {TN}")
-print(f"False Negatives (FN): {FN}")
-print(f"TPR: {TP/(TP+FP):.2f}")
-print(f"TNR: {TN/(TN+FN):.2f}")
-
-# --- k-Means Clustering --- #
-
-# create feature and target arrays from original dataset
-X = fraud_df[['V4', 'V11', 'V2', 'V19', 'V27']]
-y = fraud_df['Class'].ravel()
-
-# scale data
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-# create_knee_plot analyzes k-value vs. SSE to find optimal k
-def create_knee_plot(X, max_k):
-    sse = []
-    for i in range(1, max_k + 1):
-        kmeans = KMeans(n_clusters=i, init='random', n_init=10)
-        kmeans.fit(X)
-        sse.append(kmeans.inertia_)
-    plt.plot(range(1, max_k + 1), sse, '-b')
-    plt.xlabel('k')
-    plt.ylabel('Inertia (SSE)')
-    plt.title('Knee Plot')
-
-create_knee_plot(X_scaled, 8)
-plt.show()
-
-# create a sample of 50k for better runtime
-sample_size = 50000
-random_indices = random.sample(range(len(fraud_df)), sample_size)
-sample_df = fraud_df.iloc[random_indices, :].copy()
-
-# features for clustering
-features = ['V4', 'V11', 'V2', 'V19', 'V27']
-X_sample = sample_df[features]
-
-# standardize features
-scaler = StandardScaler()
-X_sample_scaled = scaler.fit_transform(X_sample)
-
-# create the k-means clusters (clusters = 2)
-kmeans = KMeans(n_clusters=2, init='random', n_init=10, random_state=92)
-sample_df['KMeans_Cluster'] = kmeans.fit_predict(X_sample_scaled)
-
-# plot k-means clusters
-plt.scatter(X_sample_scaled[:, 0], X_sample_scaled[:, 1],
-            c=sample_df['KMeans_Cluster'], cmap='viridis', s=50)
-plt.xlabel(f'V4 (Scaled)')
-plt.ylabel(f'V11 (Scaled)')
-plt.title('k-Means Clustering')
-plt.show()
+
+# --- PROJECT SETUP --- #
+
+# 'describe_data' prints the head, then count / mean / sd / min / max and null counts
+# for every feature, overall and per class, from one streaming pass over the csv
+def describe_data(path, chunksize=100_000):
+    print(pd.read_csv(path, nrows=5))
+
+    tables, rows = stream_class_stats(path, chunksize=chunksize)
+    overall = tables.pop('all')
+
+    # describe data and check for null values
+    print("\nSummary for all classes ({} rows):\n".format(rows))
+    print(overall.drop(columns='var'))
+    print("\nNull values:\n")
+    print(rows - overall['count'])
+
+    # print mean and sd for class = 0 (Not Fraud) and class = 1 (Fraud)
+    for cls, table in tables.items():
+        print("\nMean and SD for Class = {} ({}):\n".format(cls, class_labels.get(cls, cls)))
+        print(table[['count', 'mean', 'std']])
+
+# 'top_correlated' ranks every feature in the csv by corr with the target class in one chunked
+# pass, and returns the top n names plus their corr matrix (with the target class) for the heatmap
+def top_correlated(path, n=10, chunksize=100_000):
+    corr_with_target = target_correlation(csv_chunks(path, chunksize))
+
+    # select top 10 features based on corr with the target variable (highest first)
+    top = top_features(corr_with_target, n)
+    # create corr matrix for top features only
+    return top, correlation_matrix(csv_chunks(path, chunksize, usecols=top + ['Class']), top)
+
+# 'scale_and_split' scales the features and splits testing and training data with a 70/30 ratio;
+# StandardScaler scales each column on its own, so only the features used are fit
+def scale_and_split(fraud_df, features=FEATURES, scaler=None):
+    # feature scaling
+    if scaler is None:
+        scaler = StandardScaler().fit(fraud_df[features])
+    X = pd.DataFrame(scaler.transform(fraud_df[features]), columns=features)
+
+    # initialize target class (y)
+    y = fraud_df['Class'].to_numpy()
+
+    return train_test_split(X, y, test_size=0.3, stratify=y, random_state=92)
+
+# 'knn_sweep' finds the accuracy of k-NN for each k in k_values from a single neighbor query:
+# the test set is searched once at the largest k (in parallel across n_jobs cores), and every
+# smaller k votes over the first k of those sorted neighbors. Ties go to the lowest class,
+# as KNeighborsClassifier breaks them
+def knn_sweep(X_train, X_test, y_train, y_test, k_values=range(1, 10), n_jobs=-1):
+    k_values = list(k_values)
+    classes, y_codes = np.unique(y_train, return_inverse=True)
+    nn = NearestNeighbors(n_neighbors=max(k_values), n_jobs=n_jobs).fit(X_train)
+    neighbors = nn.kneighbors(X_test, return_distance=False)
+
+    # votes[:, j, c] = how many of the j + 1 nearest neighbors are class c
+    votes = np.cumsum(y_codes[neighbors][:, :, None] == np.arange(len(classes)), axis=1)
+    y_test = np.asarray(y_test)
+    accuracies = []
+    for k in k_values:
+        y_pred = classes[votes[:, k - 1].argmax(axis=1)]
+        accuracies.append(accuracy_score(y_test, y_pred))
+    return accuracies
+
+# 'model_specs' returns the unfitted models to compare, as (name, estimator) pairs;
+# k-NN rescales on the training split first (optimal k value is 3)
+def model_specs():
+    return [
+        ('Logistic Regression', LogisticRegression()),
+        ('k-NN (k=3)', make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=3))),
+        ('Naive Bayes', GaussianNB()),
+        ('Decision Tree', DecisionTreeClassifier(random_state=92)),
+    ]
+
+# 'report' runs the whole analysis: describe, rank, classify, cluster (timing each stage when profiled)
+def report(args):
+    plot = not args.no_plots
+    if plot:
+        from . import plots
+    # figure jobs, drawn together at the end (in parallel processes when writing files)
+    figs = []
+    stage = profiling.stage
+
+    # describe the csv and rank its features in streaming passes
+    with stage('describe'):
+        describe_data(args.data)
+    with stage('correlation'):
+        # rank at least the 10 shown in the heatmap, and enough for --top-k
+        top, correlation_matrix_top = top_correlated(args.data, n=max(10, args.top_k or 0))
+    print("\nTop features by correlation with Class:\n")
+    print(correlation_matrix_top['Class'].iloc[1:])
+    if plot:
+        figs.append(('correlation_heatmap', plots.correlation_heatmap, (correlation_matrix_top,)))
+
+    # read just the class and the model / clustering features into df, downcast to
+    # float32 / int8 (cached after the first parse)
+    if args.top_k and args.top_k > len(top):
+        raise ValueError('--top-k {} is more than the {} features ranked'.format(args.top_k, len(top)))
+    features = top[:args.top_k] if args.top_k else FEATURES
+    columns = ['Class'] + list(dict.fromkeys(features + FEATURES))
+    with stage('load'):
+        fraud_df = read_schema(args.data, FRAUD_SCHEMA, columns)
+    profiling.count('rows', len(fraud_df))
+    if args.memory:
+        print("\n" + memory_report(args.data, fraud_df))
+
+    # calc class distribution
+    class_counts = fraud_df['Class'].value_counts()
+    if plot:
+        figs.append(('class_distribution', plots.class_pie, (class_counts, class_labels)))
+
+    with stage('scale_split'):
+        feature_scaler = StandardScaler().fit(fraud_df[features])
+        X_train, X_test, y_train, y_test = scale_and_split(fraud_df, features, feature_scaler)
+
+    # -- k-NN k selection -- #
+
+    # feature scaling for kNN
+    with stage('knn_sweep'):
+        scaler = StandardScaler()
+        X_train_sc = scaler.fit_transform(X_train)
+        X_test_sc = scaler.transform(X_test)
+
+        # find optimal value for k on the same scaled features the final model uses
+        k_values = range(1, 10)
+        accuracies = knn_sweep(X_train_sc, X_test_sc, y_train, y_test, k_values)
+    if plot:
+        figs.append(('knn_accuracy', plots.knn_accuracy, (list(k_values), accuracies)))
+
+    # -- MODEL ZOO: logistic regression, k-NN (k=3), naive bayes, decision tree -- #
+
+    # train and score every model concurrently, workers reading X / y from shared memory
+    with stage('model_zoo'):
+        timings, model_preds, models = run_zoo(model_specs(), X_train, X_test, y_train, y_test,
+                                               args.workers, return_models=True)
+    # the fits ran in pool processes; file their own timings under the parent stage
+    for name, row in timings.iterrows():
+        profiling.record('model_zoo/fit ' + name, row['Fit (s)'])
+        profiling.record('model_zoo/predict ' + name, row['Predict (s)'])
+    profiling.count('predictions', len(y_test) * len(model_preds))
+    print("\nModel Timings:\n" + timings.to_string())
+    if args.save_models:
+        with stage('save_models'):
+            saved = save_artifacts(args.save_models, feature_scaler, features, models, timings['Accuracy'])
+        print("\nSaved scaler + model pipelines to " + saved)
+    if plot:
+        for name, y_pred in model_preds.items():
+            figs.append((MODEL_FIGURES.get(name, slug(name)), plots.confusion_heatmap, (confusion_matrix(y_test, y_pred), name)))
+
+    # print TP, FP, TN, FN and derived rates for every model at once
+    with stage('evaluate'):
+        comparison = confusion_table(y_test, model_preds, pos=1, neg=0)
+    print("\nModel Comparison:\n" + comparison.to_string())
+
+    # --- k-Means Clustering --- #
+
+    # scale the clustering features from the original dataset
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(fraud_df[FEATURES])
+
+    # mini-batch knee analysis, each k warm-started from the k-1 centers
+    with stage('knee'):
+        sse, _ = knee_sse(X_scaled, 8, warm_start=True)
+    if plot:
+        figs.append(('knee_plot', plots.knee_plot, (list(range(1, 9)), sse)))
+
+    # create the k-means clusters (clusters = 2) over every transaction
+    with stage('cluster'):
+        fraud_df['KMeans_Cluster'], _, inertia = cluster_all(X_scaled, k=2)
+    print("\nk-Means (k=2) over {} transactions, inertia {:.1f}:\n".format(len(fraud_df), inertia))
+    print(pd.crosstab(fraud_df['KMeans_Cluster'], fraud_df['Class']))
+    if plot:
+        # plot a seeded, class-stratified sample of 50k for better runtime
+        sample_df = reservoir_sample(frame_chunks(fraud_df), 50000, seed=92, stratify='Class')
+        figs.append(('kmeans_clusters', plots.cluster_scatter,
+                     (scaler.transform(sample_df[FEATURES]), sample_df['KMeans_Cluster'].to_numpy())))
+
+        # render every figure headless to files (across spawned processes with --workers),
+        # or show them in turn
+        with stage('plot'):
+            render_figures(figs, args.figures, args.workers)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Credit card fraud classification and clustering.')
+    parser.add_argument('--data', default=DATA_PATH, help='path to creditcard_2023.csv')
+    parser.add_argument('--figures', help='write figures to this directory instead of showing them')
+    parser.add_argument('--no-plots', action='store_true', help='skip plotting entirely')
+    parser.add_argument('--top-k', type=int,
+                        help='train on the k features most correlated with Class instead of ' + ', '.join(FEATURES))
+    parser.add_argument('--memory', action='store_true', help='report the frame\'s memory footprint')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='processes for the model zoo (default: one per core); figures render '
+                             'serially unless this is given, then in up to min(N, {}) spawned '
+                             'processes'.format(RENDER_WORKERS))
+    parser.add_argument('--save-models', metavar='DIR',
+                        help='save the fitted scaler + models as the next versioned artifact under DIR')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+    with profiling.session(args.profile, args.profile_memory):
+        report(args)
+
+if __name__ == '__main__':
+    main()
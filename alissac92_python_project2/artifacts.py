@@ -0,0 +1,120 @@
+"""
+Versioned on-disk artifacts for the fitted fraud models.
+
+Each save writes a new numbered directory (v0001, v0002, ...) holding one
+joblib file per model -- a Pipeline of the fitted feature scaler and the
+classifier -- plus a manifest.json recording the feature list, the
+scikit-learn version, each model's test accuracy and each file's content
+hash. A save claims its number by creating the directory (so concurrent
+saves never share one) and writes the manifest last; only directories
+with a manifest count as saved versions. Loading picks the latest version
+unless one is named, and refuses files whose hash no longer matches the
+manifest.
+"""
+
+import datetime
+import json
+import os
+import re
+
+import joblib
+import sklearn
+from sklearn.pipeline import make_pipeline
+
+from alissac92_python_project.csv_cache import file_hash
+
+ARTIFACT_FORMAT = 1
+
+
+# 'slug' turns a model name into a file name ('k-NN (k=3)' -> 'k-nn-k-3')
+def slug(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+# 'claimed' lists every version number under 'root', complete or still being written
+def claimed(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(d[1:]) for d in os.listdir(root) if re.fullmatch(r'v\d+', d))
+
+
+# 'versions' lists the version numbers saved (manifest written) under 'root', oldest first
+def versions(root):
+    return [v for v in claimed(root) if os.path.isfile(os.path.join(root, 'v{:04d}'.format(v), 'manifest.json'))]
+
+
+# 'claim_version' creates the next free version directory under 'root' and returns
+# (version, directory); creating it is the claim, so a concurrent save moves on to the next number
+def claim_version(root):
+    os.makedirs(root, exist_ok=True)
+    version = (claimed(root) or [0])[-1] + 1
+    while True:
+        out = os.path.join(root, 'v{:04d}'.format(version))
+        try:
+            os.makedirs(out, exist_ok=False)
+            return version, out
+        except FileExistsError:
+            version += 1
+
+
+# 'version_dir' returns the directory of one version (the latest when 'version' is None)
+def version_dir(root, version=None):
+    saved = versions(root)
+    if not saved:
+        raise FileNotFoundError('no model artifacts under {!r}'.format(root))
+    if version is None:
+        version = saved[-1]
+    elif version not in saved:
+        raise FileNotFoundError('no artifact version {} under {!r} (have {})'.format(version, root, saved))
+    return os.path.join(root, 'v{:04d}'.format(version))
+
+
+# 'save_artifacts' writes scaler + model pipelines as the next version under 'root';
+# 'models' maps name -> fitted classifier, 'metrics' optionally name -> test accuracy.
+# Returns the new version's directory
+def save_artifacts(root, scaler, features, models, metrics=None, target='Class'):
+    version, out = claim_version(root)
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'sklearn': sklearn.__version__,
+        'features': list(features),
+        'target': target,
+        'models': {},
+    }
+    for name, model in models.items():
+        path = os.path.join(out, slug(name) + '.joblib')
+        joblib.dump(make_pipeline(scaler, model), path)
+        manifest['models'][name] = {'file': os.path.basename(path), 'hash': file_hash(path)}
+        if metrics is not None and name in metrics:
+            manifest['models'][name]['accuracy'] = float(metrics[name])
+    # the manifest goes in last, atomically (temp file + rename): it marks the version complete
+    tmp = os.path.join(out, 'manifest.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out, 'manifest.json'))
+    return out
+
+
+# 'load_manifest' reads one version's manifest (the latest when 'version' is None)
+def load_manifest(root, version=None):
+    with open(os.path.join(version_dir(root, version), 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError('unsupported artifact format {!r}'.format(manifest.get('format')))
+    return manifest
+
+
+# 'load_model' returns (fitted pipeline, manifest) for one saved model
+def load_model(root, name, version=None):
+    manifest = load_manifest(root, version)
+    if name not in manifest['models']:
+        raise KeyError('no model {!r} in artifact v{} (have {})'.format(
+            name, manifest['version'], sorted(manifest['models'])))
+    entry = manifest['models'][name]
+    path = os.path.join(version_dir(root, manifest['version']), entry['file'])
+    if file_hash(path) != entry['hash']:
+        raise ValueError('{} does not match its manifest hash'.format(path))
+    return joblib.load(path), manifest
@@ -0,0 +1,93 @@
+"""
+Mini-batch k-means over every transaction.
+
+Each k in the knee analysis is fit with MiniBatchKMeans, so a fit touches
+a few thousand rows per step instead of the whole table, and the n_init
+(default 3) restarts run side by side in a thread pool (sklearn's k-means
+kernels release the GIL, so the threads share X without copying it). With
+warm_start the k solution is seeded from the best k-1 centers plus one
+new center drawn k-means++ style. Inertia and final labels are computed
+block by block, so the distance matrix never exceeds 'budget_mb'.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+BUDGET_MB = 64 # working memory for one block of point-to-center distances
+
+
+# 'block_rows' returns how many rows of X fit in the distance budget for k centers
+def block_rows(n_features, k, budget_mb=BUDGET_MB):
+    return max(1, int(budget_mb * 2 ** 20) // (8 * (k + n_features)))
+
+
+# 'assign' labels every row with its nearest center and returns (labels, inertia),
+# working through X in blocks that fit the memory budget
+def assign(X, centers, budget_mb=BUDGET_MB):
+    X = np.asarray(X)
+    c_sq = np.einsum('ij,ij->i', centers, centers)
+    labels = np.empty(len(X), dtype=np.int32)
+    inertia = 0.0
+    step = block_rows(X.shape[1], len(centers), budget_mb)
+    for start in range(0, len(X), step):
+        block = X[start:start + step]
+        d2 = np.einsum('ij,ij->i', block, block)[:, None] - 2 * block @ centers.T + c_sq
+        best = d2.argmin(axis=1)
+        labels[start:start + step] = best
+        inertia += np.maximum(d2[np.arange(len(block)), best], 0).sum()
+    return labels, inertia
+
+
+# 'grow_centers' adds one center to 'centers', drawn from a sample of X with probability
+# proportional to its squared distance from the nearest existing center (k-means++)
+def grow_centers(X, centers, rng, sample_size=10_000):
+    sample = X[rng.choice(len(X), min(sample_size, len(X)), replace=False)]
+    d2 = ((sample[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    total = d2.sum()
+    pick = rng.choice(len(sample), p=d2 / total) if total > 0 else rng.integers(len(sample))
+    return np.vstack([centers, sample[pick]])
+
+
+# 'fit_once' runs one mini-batch k-means restart and returns (centers, full-data inertia)
+def fit_once(X, k, seed, init='k-means++', batch_size=4096, max_iter=100, budget_mb=BUDGET_MB):
+    model = MiniBatchKMeans(n_clusters=k, init=init, n_init=1, batch_size=batch_size, max_iter=max_iter,
+                            compute_labels=False, random_state=seed).fit(X)
+    centers = model.cluster_centers_
+    return centers, assign(X, centers, budget_mb)[1]
+
+
+# 'best_fit' runs n_init restarts of k clusters concurrently and keeps the lowest inertia;
+# 'prev' (the k-1 centers) seeds every restart when warm starting
+def best_fit(X, k, n_init=3, prev=None, seed=92, max_workers=None, **fit_kw):
+    rng = np.random.default_rng(seed + k)
+    seeds = rng.integers(2 ** 31 - 1, size=n_init)
+    if prev is None:
+        inits = ['k-means++'] * n_init
+    else:
+        inits = [grow_centers(X, prev, np.random.default_rng(s)) for s in seeds]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fits = list(pool.map(lambda args: fit_once(X, k, args[0], args[1], **fit_kw), zip(seeds, inits)))
+    return min(fits, key=lambda fit: fit[1])
+
+
+# 'knee_sse' fits k = 1..max_k and returns the inertia (SSE) curve plus the best centers per k
+def knee_sse(X, max_k, n_init=3, warm_start=False, seed=92, max_workers=None, **fit_kw):
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    sse, centers = [], []
+    prev = None
+    for k in range(1, max_k + 1):
+        best, inertia = best_fit(X, k, n_init, prev if warm_start else None, seed, max_workers, **fit_kw)
+        sse.append(inertia)
+        centers.append(best)
+        prev = best
+    return sse, centers
+
+
+# 'cluster_all' clusters every row of X into k groups and returns (labels, centers, inertia)
+def cluster_all(X, k=2, n_init=3, seed=92, max_workers=None, budget_mb=BUDGET_MB, **fit_kw):
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    centers, _ = best_fit(X, k, n_init, None, seed, max_workers, budget_mb=budget_mb, **fit_kw)
+    labels, inertia = assign(X, centers, budget_mb)
+    return labels, centers, inertia
@@ -0,0 +1,143 @@
+"""
+Parallel stratified k-fold cross-validation.
+
+Fold assignments are computed once and the rows are sorted by fold into
+a single shared copy of X and y, so every fold's test rows are one slice
+and its training rows the two slices around it. Each fold's
+StandardScaler is fit once, from those slices without copying them, and
+sent to the workers as a few small arrays; nothing scaled is shared.
+Every (model, fold) pair runs as its own task in a process pool, mapping
+the shared blocks instead of receiving pickled copies; a task copies only
+its own training rows, once, and scales them in place. Results come back
+as one table of per-fold metrics and fit / predict timings, plus a
+mean / std summary per model.
+
+    python -m alissac92_python_project2 cv [--data creditcard_2023.csv] [--folds 5]
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from alissac92_python_project import profiling
+from alissac92_python_project.evaluate import confusion_table
+from alissac92_python_project.schema import FRAUD_SCHEMA, read_schema
+
+from .acrist_term_project import DATA_PATH, FEATURES, model_specs
+from .model_zoo import share, attach, release, fit_score
+
+METRICS = ['Accuracy', 'Precision', 'TPR', 'TNR']
+
+
+# 'fold_ids' returns the stratified fold (0..folds-1) of every row
+def fold_ids(y, folds=5, seed=92):
+    ids = np.empty(len(y), dtype=np.int32)
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    for fold, (_, test) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        ids[test] = fold
+    return ids
+
+
+# 'fold_order' returns the row order that groups the folds together and the bounds of each
+# fold in it: fold f is rows bounds[f]:bounds[f + 1] of the reordered data
+def fold_order(ids, folds):
+    order = np.argsort(ids, kind='stable')
+    return order, np.searchsorted(ids[order], np.arange(folds + 1))
+
+
+# 'fold_scalers' fits one scaler per fold on its training rows (the slices either side of the
+# fold in the fold-sorted X), merging the two slices' statistics instead of copying them
+def fold_scalers(X, bounds):
+    scalers = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        scaler = StandardScaler()
+        for part in (X[:start], X[stop:]):
+            if len(part):
+                scaler.partial_fit(part)
+        scalers.append(scaler)
+    return scalers
+
+
+# 'cv_worker' runs in a pool process: map the fold-sorted X and y, copy and scale the fold's
+# training rows, then fit one model on them and score it on the held-out slice
+def cv_worker(job):
+    name, fold, estimator, scaler, (start, stop), x_spec, y_spec = job
+    blocks, (X, y) = zip(*(attach(spec) for spec in (x_spec, y_spec)))
+    try:
+        X_train = scaler.transform(np.concatenate((X[:start], X[stop:])), copy=False)
+        X_test = scaler.transform(X[start:stop])
+        y_train, y_test = np.concatenate((y[:start], y[stop:])), y[start:stop]
+        row, y_pred = fit_score(estimator, X_train, X_test, y_train, y_test)
+        scores = confusion_table(y_test, {name: y_pred}, pos=1, neg=0).iloc[0]
+        row.update({m: scores[m] for m in METRICS})
+        return name, fold, row
+    finally:
+        del estimator, X, y
+        release(blocks)
+
+
+# 'cross_validate' runs every model in 'models' ([(name, unfitted estimator), ...]) on every
+# fold across a process pool; returns (per-fold table, per-model mean / std summary)
+def cross_validate(models, X, y, folds=5, seed=92, max_workers=None):
+    y = np.asarray(y)
+    order, bounds = fold_order(fold_ids(y, folds, seed), folds)
+    blocks = []
+    try:
+        # one fold-sorted copy of X and y in shared memory, plus each fold's scaler
+        with profiling.stage('scale_folds'):
+            X_sorted = np.asarray(X, dtype=np.float64)[order]
+            scalers = fold_scalers(X_sorted, bounds)
+            x_shm, x_spec = share(X_sorted)
+            blocks.append(x_shm)
+            del X_sorted
+            y_shm, y_spec = share(y[order])
+            blocks.append(y_shm)
+
+        jobs = [(name, f, estimator, scalers[f], (bounds[f], bounds[f + 1]), x_spec, y_spec)
+                for f in range(folds) for name, estimator in models]
+        workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+        with profiling.stage('folds'), ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(cv_worker, jobs))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    index = pd.MultiIndex.from_tuples([(name, f) for name, f, _ in results], names=['Model', 'Fold'])
+    table = pd.DataFrame([row for _, _, row in results], index=index)
+    for (name, _), row in table.iterrows():
+        profiling.record('folds/fit ' + name, row['Fit (s)'])
+        profiling.record('folds/predict ' + name, row['Predict (s)'])
+    order = [name for name, _ in models]
+    summary = table.groupby(level='Model', sort=False).agg(['mean', 'std']).reindex(order)
+    return table, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stratified k-fold comparison of the fraud models.')
+    parser.add_argument('--data', default=DATA_PATH, help='path to creditcard_2023.csv')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=92)
+    parser.add_argument('--workers', type=int, help='processes (default: one per core)')
+    parser.add_argument('--per-fold', action='store_true', help='also print every fold\'s row')
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with profiling.session(args.profile, args.profile_memory):
+        with profiling.stage('load'):
+            fraud_df = read_schema(args.data, FRAUD_SCHEMA, ['Class'] + FEATURES)
+        profiling.count('rows', len(fraud_df))
+        table, summary = cross_validate(model_specs(), fraud_df[FEATURES], fraud_df['Class'],
+                                        args.folds, args.seed, args.workers)
+        if args.per_fold:
+            print(table.to_string() + "\n")
+        print("{}-fold cross-validation ({} rows):\n".format(args.folds, len(fraud_df)) + summary.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Low-latency scoring for the saved LogisticRegression and GaussianNB models.
+
+Both binary models reduce to a log-odds of the raw (unscaled) features:
+
+    logit(x) = x^2 . quad + x . lin + const
+
+The StandardScaler is folded into the coefficients: logistic regression
+has quad = 0 and lin = coef / scale, and Gaussian NB's per-class means
+and variances are mapped back to raw units (theta * scale + mean and
+var * scale^2) before expanding the two class log-likelihoods. Scoring a
+single vector or a micro-batch is then one or two dot products on plain
+NumPy arrays, with no DataFrame, validation or pipeline dispatch.
+
+    python -m alissac92_python_project2 latency MODELS_DIR transactions.csv
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+
+from .artifacts import load_model
+
+FAST_MODELS = ('Logistic Regression', 'Naive Bayes')
+
+
+class FastScorer:
+    # binary scorer over raw feature vectors: P(classes[1]) = sigmoid(x^2 . quad + x . lin + const)
+    def __init__(self, quad, lin, const, classes, features=None):
+        self.quad = None if quad is None or not np.any(quad) else np.ascontiguousarray(quad, dtype=np.float64)
+        self.lin = np.ascontiguousarray(lin, dtype=np.float64)
+        self.const = float(const)
+        self.classes = np.asarray(classes)
+        self.features = features
+
+    # 'from_models' folds a fitted StandardScaler (or None) into a fitted LogisticRegression / GaussianNB
+    @classmethod
+    def from_models(cls, scaler, model, features=None):
+        if len(model.classes_) != 2:
+            raise ValueError('FastScorer handles binary models only')
+        n = model.n_features_in_
+        mean = np.zeros(n) if scaler is None or scaler.mean_ is None else scaler.mean_
+        scale = np.ones(n) if scaler is None or scaler.scale_ is None else scaler.scale_
+
+        if hasattr(model, 'coef_'):
+            # logistic regression: coef . (x - mean) / scale + b
+            w = model.coef_[0] / scale
+            return cls(None, w, model.intercept_[0] - w @ mean, model.classes_, features)
+
+        if hasattr(model, 'theta_'):
+            # gaussian NB: each class is a diagonal gaussian; map it back to raw units, then
+            # log P(1|x) - log P(0|x) = sum(-x^2/2v + x*theta/v - theta^2/2v - log(2*pi*v)/2) + log prior
+            theta = model.theta_ * scale + mean
+            var = model.var_ * scale ** 2
+            inv = 1.0 / var
+            quad = -0.5 * (inv[1] - inv[0])
+            lin = theta[1] * inv[1] - theta[0] * inv[0]
+            const = (-0.5 * (theta[1] ** 2 * inv[1] - theta[0] ** 2 * inv[0]).sum()
+                     - 0.5 * np.log(var[1] / var[0]).sum()
+                     + np.log(model.class_prior_[1] / model.class_prior_[0]))
+            return cls(quad, lin, const, model.classes_, features)
+
+        raise TypeError('no fast path for {}'.format(type(model).__name__))
+
+    # 'from_pipeline' builds a scorer from a saved [scaler, model] Pipeline
+    @classmethod
+    def from_pipeline(cls, pipeline, features=None):
+        steps = [step for _, step in pipeline.steps]
+        scaler = steps[0] if len(steps) > 1 else None
+        return cls.from_models(scaler, steps[-1], features)
+
+    # 'logit' returns the log-odds for one feature vector (a float) or a micro-batch (an array)
+    def logit(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        z = x @ self.lin + self.const
+        if self.quad is not None:
+            z = z + (x * x) @ self.quad
+        return z
+
+    # 'predict_proba' returns P(classes[1]) for one vector or each row of a micro-batch
+    def predict_proba(self, x):
+        return expit(self.logit(x))
+
+    # 'predict' returns the predicted class for one vector or each row of a micro-batch
+    def predict(self, x):
+        return self.classes[(np.asarray(self.logit(x)) > 0).astype(np.int8)]
+
+
+# 'latencies' times 'fn' once per call over successive slices of X and returns per-call seconds
+def latencies(fn, X, batch=1, calls=2000):
+    if not 1 <= batch <= len(X):
+        raise ValueError('batch size {} needs 1..{} rows of data'.format(batch, len(X)))
+    times = np.empty(calls)
+    n = len(X) - batch + 1
+    for i in range(calls):
+        start = (i * batch) % n
+        rows = X[start] if batch == 1 else X[start:start + batch]
+        t0 = time.perf_counter()
+        fn(rows)
+        times[i] = time.perf_counter() - t0
+    return times
+
+
+# 'latency_table' compares sklearn's pipeline.predict on a DataFrame with FastScorer.predict
+# for each saved model and batch size; p50 / p99 are per call, in microseconds
+def latency_table(models_dir, data, models=FAST_MODELS, batches=(1, 32), calls=2000, version=None):
+    rows = []
+    for name in models:
+        pipeline, manifest = load_model(models_dir, name, version)
+        features = manifest['features']
+        X = pd.read_csv(data, usecols=features, nrows=max(batches) * 100)[features]
+        X_np = X.to_numpy(dtype=np.float64)
+        scorer = FastScorer.from_pipeline(pipeline, features)
+        agree = (scorer.predict(X_np) == pipeline.predict(X)).mean()
+
+        for batch in batches:
+            sk_calls = max(1, calls // 10) # sklearn is slow enough that fewer calls suffice
+            paths = {
+                'sklearn': latencies(lambda r: pipeline.predict(
+                    pd.DataFrame(np.atleast_2d(r), columns=features)), X_np, batch, sk_calls),
+                'fast': latencies(scorer.predict, X_np, batch, calls),
+            }
+            for path, times in paths.items():
+                us = times * 1e6
+                rows.append({'Model': name, 'Path': path, 'Batch': batch, 'Calls': len(times),
+                             'p50 (us)': np.percentile(us, 50), 'p99 (us)': np.percentile(us, 99),
+                             'Agreement': agree})
+    return pd.DataFrame(rows).set_index(['Model', 'Batch', 'Path'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='p50 / p99 latency of the fast scorer against sklearn.')
+    parser.add_argument('models', help='artifact directory written by --save-models')
+    parser.add_argument('data', help='transactions CSV to draw feature vectors from')
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 32], help='micro-batch sizes')
+    parser.add_argument('--calls', type=int, default=2000, help='timed calls per batch size')
+    parser.add_argument('--version', type=int, help='artifact version (default: latest)')
+    args = parser.parse_args(argv)
+
+    print(latency_table(args.models, args.data, batches=args.batch, calls=args.calls,
+                        version=args.version).to_string())
+
+
+if __name__ == '__main__':
+    main()
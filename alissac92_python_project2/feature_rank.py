@@ -0,0 +1,128 @@
+"""
+Chunked feature-to-target correlation and feature ranking.
+
+Co-moment sums (sum x, sum x^2, sum x*y) are accumulated chunk by chunk,
+so ranking d features against the target costs O(n*d) instead of the
+O(n*d^2) of a full corr() matrix. The pairwise matrix (sum x x^T) is only
+accumulated when asked for, typically over just the top-ranked columns
+for the heatmap. Sums are taken around the first chunk's means to keep
+the one-pass formulas numerically stable.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CoMoments:
+    # running co-moment sums of d feature columns against one target column
+    def __init__(self, n_cols, full=False):
+        self.n = 0
+        self.shift = None
+        self.shift_y = 0.0
+        self.sx = np.zeros(n_cols)
+        self.sxx = np.zeros(n_cols)
+        self.sxy = np.zeros(n_cols)
+        self.sy = 0.0
+        self.syy = 0.0
+        self.sXX = np.zeros((n_cols, n_cols)) if full else None
+
+    # 'update' folds a block of rows (x: n x d features, y: n targets) into the sums;
+    # rows with a NaN anywhere are skipped
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        keep = ~(np.isnan(x).any(axis=1) | np.isnan(y))
+        x, y = x[keep], y[keep]
+        if len(x) == 0:
+            return
+        if self.shift is None:
+            self.shift = x.mean(axis=0)
+            self.shift_y = y.mean()
+        xc = x - self.shift
+        yc = y - self.shift_y
+        self.n += len(x)
+        self.sx += xc.sum(axis=0)
+        self.sxx += np.einsum('ij,ij->j', xc, xc)
+        self.sxy += yc @ xc
+        self.sy += yc.sum()
+        self.syy += yc @ yc
+        if self.sXX is not None:
+            self.sXX += xc.T @ xc
+
+    # 'target_corr' returns the Pearson correlation of every feature with the target
+    # (0.0 where a column is constant, the repo's convention for empty denominators)
+    def target_corr(self):
+        n = max(self.n, 1)
+        cov = self.sxy - self.sx * self.sy / n
+        var_x = self.sxx - self.sx ** 2 / n
+        var_y = self.syy - self.sy ** 2 / n
+        denom = np.sqrt(var_x * var_y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(denom > 0, cov / denom, 0.0)
+
+    # 'corr_matrix' returns the (d + 1) x (d + 1) correlation matrix of the features and the
+    # target (target last); only available when built with full=True
+    def corr_matrix(self):
+        if self.sXX is None:
+            raise ValueError('CoMoments was built without full=True')
+        n = max(self.n, 1)
+        s = np.append(self.sx, self.sy)
+        d = len(self.sx)
+        cross = np.empty((d + 1, d + 1))
+        cross[:d, :d] = self.sXX
+        cross[:d, d] = cross[d, :d] = self.sxy
+        cross[d, d] = self.syy
+        cov = cross - np.outer(s, s) / n
+        sd = np.sqrt(np.diag(cov))
+        denom = np.outer(sd, sd)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.where(denom > 0, cov / denom, 0.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+
+# 'frame_chunks' yields consecutive row blocks of an in-memory frame
+def frame_chunks(df, chunksize=100_000):
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+# 'csv_chunks' yields row blocks of a csv without reading the whole file
+def csv_chunks(path, chunksize=100_000, **read_kwargs):
+    return pd.read_csv(path, chunksize=chunksize, **read_kwargs)
+
+
+# 'accumulate' runs CoMoments over 'chunks'; 'columns' defaults to everything but target and 'drop'
+def accumulate(chunks, target='Class', columns=None, drop=('id',), full=False):
+    moments = None
+    for chunk in chunks:
+        if moments is None:
+            if columns is None:
+                columns = [c for c in chunk.columns if c not in drop and c != target]
+            columns = list(columns)
+            moments = CoMoments(len(columns), full=full)
+        moments.update(chunk[columns].to_numpy(dtype=np.float64), chunk[target].to_numpy())
+    if moments is None:
+        raise ValueError('no rows to correlate')
+    return moments, columns
+
+
+# 'target_correlation' returns every feature's correlation with 'target', sorted highest first
+def target_correlation(chunks, target='Class', drop=('id',)):
+    moments, columns = accumulate(chunks, target, drop=drop)
+    return pd.Series(moments.target_corr(), index=columns, name=target).sort_values(ascending=False)
+
+
+# 'top_features' returns the k best-ranked feature names (by signed or absolute correlation)
+def top_features(corr, k=10, by_abs=False):
+    ranked = corr.abs().sort_values(ascending=False) if by_abs else corr.sort_values(ascending=False)
+    return list(ranked.index[:k])
+
+
+# 'correlation_matrix' returns the correlation matrix of 'columns' plus the target (target first)
+def correlation_matrix(chunks, columns, target='Class'):
+    moments, columns = accumulate(chunks, target, columns=columns, full=True)
+    order = [len(columns)] + list(range(len(columns)))
+    corr = moments.corr_matrix()[np.ix_(order, order)]
+    names = [target] + columns
+    return pd.DataFrame(corr, index=names, columns=names)
@@ -0,0 +1,103 @@
+"""
+Concurrent model-zoo trainer.
+
+Every estimator in the zoo is fit and scored in its own worker process.
+X_train / X_test / y_train / y_test are copied once into shared memory
+and the workers map them by name, so only the (unfitted) estimators and
+the test predictions (and, on request, the fitted models) cross the
+process boundary. The result is one comparison table of fit / predict
+timings and accuracy, plus each model's test predictions for
+confusion_table.
+"""
+
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+
+
+# 'share' copies an array into a new shared-memory block and returns (block, spec);
+# the spec (name, shape, dtype) is what workers need to map it
+def share(arr):
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+# 'attach' maps a shared block from its spec and returns (block, read-only array view)
+def attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    arr.flags.writeable = False
+    return shm, arr
+
+
+# 'release' closes a worker's shared blocks; a view that is still alive (held by a fitted model
+# or by the frames of an exception being raised) makes close() raise BufferError, which would hide
+# the real error, so such a block is left for the process to unmap when it exits
+def release(blocks):
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+# 'fit_score' fits one estimator and returns its timings and test predictions
+def fit_score(estimator, X_train, X_test, y_train, y_test):
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = np.array(estimator.predict(X_test))
+    predict_s = time.perf_counter() - start
+    return {'Fit (s)': fit_s, 'Predict (s)': predict_s,
+            'Accuracy': accuracy_score(y_test, y_pred)}, y_pred
+
+
+# 'train_worker' runs in a pool process: map the shared arrays, fit and score one model;
+# a kept model is pickled here, while any views it holds on the shared arrays are still mapped
+def train_worker(job):
+    name, estimator, specs, keep = job
+    blocks, arrays = zip(*(attach(spec) for spec in specs))
+    try:
+        row, y_pred = fit_score(estimator, *arrays)
+        return name, row, y_pred, pickle.dumps(estimator) if keep else None
+    finally:
+        # drop every view we hold (the fitted model may hold one) before unmapping
+        del estimator, arrays
+        release(blocks)
+
+
+# 'run_zoo' trains and scores 'models' ([(name, unfitted estimator), ...]) concurrently;
+# returns (comparison table, {name: test predictions}) in the order given, plus
+# {name: fitted model} when return_models is set
+def run_zoo(models, X_train, X_test, y_train, y_test, max_workers=None, return_models=False):
+    blocks, specs = [], []
+    try:
+        for arr in (X_train, X_test, y_train, y_test):
+            shm, spec = share(np.asarray(arr))
+            blocks.append(shm)
+            specs.append(spec)
+        jobs = [(name, estimator, specs, return_models) for name, estimator in models]
+        workers = min(max_workers or os.cpu_count() or 1, len(jobs)) or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(train_worker, jobs))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    table = pd.DataFrame.from_dict({name: row for name, row, _, _ in results}, orient='index')
+    preds = {name: y_pred for name, _, y_pred, _ in results}
+    if return_models:
+        return table, preds, {name: pickle.loads(model) for name, _, _, model in results}
+    return table, preds
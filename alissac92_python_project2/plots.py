@@ -0,0 +1,87 @@
+"""
+Optional plotting layer for the fraud project.
+
+matplotlib and seaborn are only imported when a figure is drawn; pass an
+output path to render headless to file instead of blocking on plt.show().
+Every function here is a module-level (picklable) plot job for
+render_figures.
+"""
+
+import numpy as np
+
+from alissac92_python_project.plots import pyplot, finish, thin_scatter
+
+
+# 'seaborn' imports seaborn on first use
+def seaborn():
+    import seaborn as sns
+    return sns
+
+
+# create and plot heatmap of the top features' correlation matrix
+def correlation_heatmap(correlation_matrix_top, out=None):
+    plt = pyplot(headless=out is not None)
+    sns = seaborn()
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(correlation_matrix_top, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5)
+    plt.title('Correlation Heatmap of Features to Target Class')
+    finish(plt, out)
+
+
+# create and show pie chart of the class distribution
+def class_pie(class_counts, class_labels, out=None):
+    plt = pyplot(headless=out is not None)
+    sns = seaborn()
+    plt.figure(figsize=(10, 8))
+    plt.pie(class_counts, labels=[class_labels[idx] for idx in class_counts.index], autopct='%1.1f%%',
+            startangle=90, colors=sns.color_palette('icefire'))
+    plt.title('Class Distribution')
+    finish(plt, out)
+
+
+# plot a confusion matrix (true label across, predicted label down)
+def confusion_heatmap(mtx, title, out=None):
+    plt = pyplot(headless=out is not None)
+    sns = seaborn()
+    plt.figure()
+    sns.heatmap(mtx.T, square=True, annot=True, fmt='d', cbar=True)
+    plt.title(title)
+    plt.xlabel('true label')
+    plt.ylabel('predicted label')
+    finish(plt, out)
+
+
+# plot k-NN accuracy against k
+def knn_accuracy(k_values, accuracies, out=None):
+    plt = pyplot(headless=out is not None)
+    plt.figure()
+    plt.plot(k_values, accuracies, marker='o')
+    plt.xlabel('Number of Neighbors (k)')
+    plt.ylabel('Accuracy')
+    plt.title('kNN: Accuracy vs. k')
+    finish(plt, out)
+
+
+# plot k-value vs. SSE to find the knee
+def knee_plot(k_values, sse, out=None):
+    plt = pyplot(headless=out is not None)
+    plt.figure()
+    plt.plot(k_values, sse, '-b')
+    plt.xlabel('k')
+    plt.ylabel('Inertia (SSE)')
+    plt.title('Knee Plot')
+    finish(plt, out)
+
+
+# plot k-means clusters on the first two scaled features, thinned to one point per grid cell and
+# cluster (the markers overlap far more than that anyway)
+def cluster_scatter(X_scaled, clusters, out=None):
+    plt = pyplot(headless=out is not None)
+    keep = thin_scatter(X_scaled[:, 0], X_scaled[:, 1], clusters)
+    X_scaled, clusters = X_scaled[keep], np.asarray(clusters)[keep]
+    plt.figure()
+    plt.scatter(X_scaled[:, 0], X_scaled[:, 1], c=clusters, cmap='viridis', s=50)
+    plt.xlabel('V4 (Scaled)')
+    plt.ylabel('V11 (Scaled)')
+    plt.title('k-Means Clustering')
+    finish(plt, out)
@@ -0,0 +1,101 @@
+"""
+Seeded one-pass reservoir sampling over chunked sources.
+
+Every row gets a uniform random key from a seeded generator and the
+sample is the n rows with the smallest keys, which is a uniform sample
+without replacement. Chunks only ever merge into a reservoir of at most
+n rows, so memory is proportional to the sample, not the source, and the
+keys are drawn row by row in file order, so the same seed gives the same
+sample whatever the chunk size.
+
+Stratified sampling keeps one reservoir per class and, once the pass is
+done, splits n across classes in proportion to their counts (or evenly
+with balanced=True), taking each class's share from its own reservoir.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .feature_rank import csv_chunks
+
+
+class Reservoir:
+    # the (at most) 'size' rows with the smallest keys seen so far
+    def __init__(self, size):
+        self.size = size
+        self.keys = np.empty(0)
+        self.rows = None
+        self.seen = 0
+
+    # 'offer' merges a block of rows and their keys, keeping the 'size' smallest keys
+    def offer(self, rows, keys):
+        self.seen += len(rows)
+        if len(self.keys) >= self.size:
+            # only keys below the current worst can get in
+            keep = keys < self.keys.max()
+            rows, keys = rows[keep], keys[keep]
+        if len(rows) == 0:
+            return
+        keys = np.concatenate([self.keys, keys])
+        rows = rows if self.rows is None else pd.concat([self.rows, rows])
+        if len(keys) > self.size:
+            best = np.argpartition(keys, self.size - 1)[:self.size]
+            keys, rows = keys[best], rows.iloc[best]
+        self.keys, self.rows = keys, rows
+
+    # 'take' returns the n rows with the smallest keys
+    def take(self, n):
+        if self.rows is None or n <= 0:
+            return None
+        return self.rows.iloc[np.argsort(self.keys, kind='stable')[:n]]
+
+
+# 'quotas' splits n across strata in proportion to 'counts' (largest remainder), or evenly when
+# balanced, never asking a stratum for more rows than it has
+def quotas(counts, n, balanced=False):
+    counts = pd.Series(counts, dtype=np.int64)
+    n = min(n, int(counts.sum()))
+    share = pd.Series(1.0, index=counts.index) if balanced else counts.astype(float)
+    alloc = pd.Series(0, index=counts.index)
+    while alloc.sum() < n:
+        room = counts - alloc
+        open_ = room > 0
+        want = share[open_] / share[open_].sum() * (n - alloc.sum())
+        add = np.minimum(np.floor(want).astype(np.int64), room[open_])
+        if add.sum() == 0: # hand out the remainder one row at a time, largest fraction first
+            frac = (want - np.floor(want)).sort_values(ascending=False, kind='stable')
+            add = pd.Series(0, index=want.index)
+            add[frac.index[:n - alloc.sum()]] = 1
+        alloc[add.index] += add
+    return alloc
+
+
+# 'reservoir_sample' draws n rows from an iterable of DataFrame chunks in one pass; with
+# 'stratify' (a column name) the sample keeps that column's class proportions (or equal
+# shares when balanced). Rows keep their source index and come back in source order
+def reservoir_sample(chunks, n, seed=92, stratify=None, balanced=False):
+    rng = np.random.default_rng(seed)
+    reservoirs = {}
+    for chunk in chunks:
+        keys = rng.random(len(chunk))
+        if stratify is None:
+            reservoirs.setdefault(None, Reservoir(n)).offer(chunk, keys)
+            continue
+        strata = chunk[stratify].to_numpy()
+        for value in np.unique(strata):
+            mask = strata == value
+            reservoirs.setdefault(value, Reservoir(n)).offer(chunk[mask], keys[mask])
+    if not reservoirs:
+        raise ValueError('no rows to sample')
+    if stratify is None:
+        return reservoirs[None].take(n).sort_index(kind='stable')
+
+    alloc = quotas({v: r.seen for v, r in reservoirs.items()}, n, balanced)
+    parts = [reservoirs[v].take(int(alloc[v])) for v in alloc.index]
+    sample = pd.concat([p for p in parts if p is not None])
+    return sample.sort_index(kind='stable')
+
+
+# 'sample_csv' streams a CSV in chunks and draws a seeded (optionally stratified) sample of n rows
+def sample_csv(path, n, seed=92, stratify=None, balanced=False, chunksize=100_000, **read_kwargs):
+    return reservoir_sample(csv_chunks(path, chunksize, **read_kwargs), n, seed, stratify, balanced)
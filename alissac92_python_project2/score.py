@@ -0,0 +1,95 @@
+"""
+Batch scoring with saved model artifacts.
+
+Streams a transactions CSV in chunks, reading only the id and the
+artifact's feature columns, in their FRAUD_SCHEMA dtypes. Each chunk
+goes through the saved scaler + model pipeline and is appended to the
+output CSV, so memory stays bounded by the chunk size however large the
+input is.
+
+    python -m alissac92_python_project2 score MODELS_DIR transactions.csv [--out scored.csv]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from alissac92_python_project import profiling
+from alissac92_python_project.schema import FRAUD_SCHEMA
+
+from .artifacts import load_model
+
+DEFAULT_MODEL = 'Logistic Regression'
+
+
+# 'score_chunk' returns the kept columns of one chunk plus its predicted class and fraud probability
+def score_chunk(pipeline, chunk, features, keep=('id',), positive=1):
+    X = chunk[features]
+    scored = chunk[[c for c in keep if c in chunk.columns]].copy()
+    scored['Prediction'] = pipeline.predict(X)
+    if hasattr(pipeline, 'predict_proba'):
+        col = int(np.flatnonzero(pipeline.classes_ == positive)[0])
+        scored['Fraud Probability'] = pipeline.predict_proba(X)[:, col]
+    return scored
+
+
+# 'score_csv' scores 'path' chunk by chunk into 'out' and returns (rows, seconds)
+def score_csv(models_dir, path, out, model=DEFAULT_MODEL, version=None, chunksize=100_000, keep=('id',)):
+    with profiling.stage('load_model'):
+        pipeline, manifest = load_model(models_dir, model, version)
+    features = manifest['features']
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [f for f in features if f not in header]
+    if missing:
+        raise ValueError('{} is missing feature columns {}'.format(path, missing))
+    keep = [c for c in keep if c in header]
+
+    dtype = {c: FRAUD_SCHEMA[c] for c in keep + features if c in FRAUD_SCHEMA}
+
+    rows = 0
+    start = time.perf_counter()
+    # the header goes out first, so an input with no rows still gets an (empty) scored file
+    columns = keep + ['Prediction'] + (['Fraud Probability'] if hasattr(pipeline, 'predict_proba') else [])
+    pd.DataFrame(columns=columns).to_csv(out, index=False)
+
+    chunks = pd.read_csv(path, usecols=keep + features, dtype=dtype, chunksize=chunksize)
+    while True:
+        with profiling.stage('read'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        if len(chunk) == 0: # a header-only input yields one empty chunk
+            continue
+        with profiling.stage('score'):
+            scored = score_chunk(pipeline, chunk, features, keep)
+        with profiling.stage('write'):
+            scored.to_csv(out, mode='a', header=False, index=False)
+        rows += len(chunk)
+        profiling.count('rows', len(chunk))
+        profiling.count('chunks')
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score a transactions CSV with saved fraud models.')
+    parser.add_argument('models', help='artifact directory written by --save-models')
+    parser.add_argument('data', help='transactions CSV holding the model features')
+    parser.add_argument('--out', help='scored CSV to write (default: <data>_scored.csv)')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='saved model name (default: %(default)s)')
+    parser.add_argument('--version', type=int, help='artifact version (default: latest)')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    profiling.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    out = args.out or os.path.splitext(args.data)[0] + '_scored.csv'
+    with profiling.session(args.profile, args.profile_memory):
+        rows, seconds = score_csv(args.models, args.data, out, args.model, args.version, args.chunksize)
+    print('Scored {:,} rows with {} in {:.2f}s ({:,.0f} rows/sec) -> {}'.format(
+        rows, args.model, seconds, rows / seconds if seconds else 0.0, out))
+
+
+if __name__ == '__main__':
+    main()
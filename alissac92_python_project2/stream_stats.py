@@ -0,0 +1,90 @@
+"""
+One-pass streaming summary statistics.
+
+Reads a CSV in chunks and keeps count, mean, sum of squared deviations
+(M2), min and max per feature, overall and per class. Chunk results are
+merged with Chan et al.'s pairwise update, which stays numerically stable
+without ever holding the file, or a per-class copy of it, in memory.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    # per-column running count / mean / M2 / min / max over any number of chunks
+    def __init__(self, n_cols):
+        self.count = np.zeros(n_cols)
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+        self.min = np.full(n_cols, np.inf)
+        self.max = np.full(n_cols, -np.inf)
+
+    # 'update' folds a 2-D block of rows into the running stats (NaNs are skipped)
+    def update(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if len(x) == 0:
+            return
+        valid = ~np.isnan(x)
+        n_b = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, np.nansum(x, axis=0) / n_b, 0.0)
+        m2_b = np.nansum(np.where(valid, x - mean_b, 0.0) ** 2, axis=0)
+        self.merge(n_b, mean_b, m2_b,
+                   np.where(valid, x, np.inf).min(axis=0), np.where(valid, x, -np.inf).max(axis=0))
+
+    # 'merge' combines another block's count / mean / M2 / min / max into this one
+    def merge(self, n_b, mean_b, m2_b, min_b, max_b):
+        n = self.count + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean_b - self.mean
+            self.mean = np.where(n > 0, self.mean + delta * n_b / n, 0.0)
+            self.m2 = np.where(n > 0, self.m2 + m2_b + delta ** 2 * self.count * n_b / n, 0.0)
+        self.count = n
+        self.min = np.minimum(self.min, min_b)
+        self.max = np.maximum(self.max, max_b)
+
+    # 'var' returns the sample variance (ddof=1, as pandas' std uses), NaN for < 2 values
+    def var(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    # 'to_frame' returns one row per column with count, mean, std, var, min and max
+    def to_frame(self, columns):
+        seen = self.count > 0
+        return pd.DataFrame({
+            'count': self.count.astype(np.int64),
+            'mean': np.where(seen, self.mean, np.nan),
+            'std': np.sqrt(self.var()),
+            'var': self.var(),
+            'min': np.where(seen, self.min, np.nan),
+            'max': np.where(seen, self.max, np.nan),
+        }, index=list(columns))
+
+
+# 'stream_class_stats' streams 'path' in chunks and returns summary tables for every feature:
+# {'all': overall, <class value>: that class only, ...}, plus the total row count
+def stream_class_stats(path, target='Class', drop=('id',), chunksize=100_000, **read_kwargs):
+    overall = None
+    by_class = {}
+    rows = 0
+    features = None
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_kwargs):
+        if features is None:
+            features = [c for c in chunk.columns if c not in drop and c != target]
+            overall = RunningStats(len(features))
+        x = chunk[features].to_numpy(dtype=np.float64)
+        y = chunk[target].to_numpy()
+        rows += len(chunk)
+        overall.update(x)
+        for cls in np.unique(y):
+            if cls not in by_class:
+                by_class[cls] = RunningStats(len(features))
+            by_class[cls].update(x[y == cls])
+    if features is None:
+        raise ValueError('{} has no rows'.format(path))
+
+    tables = {'all': overall.to_frame(features)}
+    for cls in sorted(by_class):
+        tables[cls.item() if hasattr(cls, 'item') else cls] = by_class[cls].to_frame(features)
+    return tables, rows